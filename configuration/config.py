@@ -123,6 +123,11 @@ API_ENDPOINTS = {
     'idfm_general_message': 'https://prim.iledefrance-mobilites.fr/marketplace/general-message',
 }
 
+# URL builders for the templated RATP endpoints, call with a mapping:
+# RATP_SCHEDULES_URL({"type": "rers", "line": "A", "station": "la+defense"})
+RATP_SCHEDULES_URL = API_ENDPOINTS['ratp_schedules'].format_map
+RATP_TRAFFIC_URL = API_ENDPOINTS['ratp_traffic'].format_map
+
 # Add bus stops coordinates for La Défense area
 BUS_STOPS_LADEFENSE = {
     "Grande Arche": {"lat": 48.8924, "lon": 2.2359},
@@ -1,10 +1,17 @@
 import plotly.express as px
 
 import pandas as pd
+import numpy as np
 
 from datetime import datetime, timedelta
+import functools
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 from enhanced_dashboard_transport import create_transport_dashboard_section, render_enhanced_schedule_summary
 
@@ -26,13 +33,18 @@ if parent_dir not in sys.path:
 
 # Import project modules
 from configuration.config import DATA_LAKE
-from utils.data_lake_utils import read_parquet_from_data_lake, read_json_from_data_lake
-from dash_app.components.maps import render_station_map
+from utils.data_lake_utils import (
+    read_parquet_from_data_lake, read_json_from_data_lake,
+    read_many_parquet_from_data_lake, list_all_keys,
+    read_parquet_table_from_data_lake
+)
+from dash_app.components.maps import render_station_map, station_map_points
 from dash_app.components.weather import render_weather_section
 from dash_app.components.transport import (
-    render_transport_status, render_schedules, render_transport_usage_chart, render_line_performance_metrics
+    render_transport_status, render_schedules, render_transport_usage_chart, render_line_performance_metrics,
+    add_status_styles
 )
-from dash_app.components.stations import render_station_details
+from dash_app.components.stations import render_station_details, count_availability
 
 
 def reset_route_planner_state():
@@ -94,96 +106,143 @@ def safe_get_weather_value(current_data, key, default=0):
     except (ValueError, TypeError):
         return default
 
+logger = logging.getLogger('dashboard')
+
+
+def safe_load(default, what):
+    """Decorator for data loaders: on error, log it, show it and return default (or default())"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                logger.error("%s failed: %s", func.__name__, e)
+                st.error(f"Error loading {what}: {e}")
+                return default() if callable(default) else default
+        return wrapper
+    return decorator
+
+
+# Shared empty frames for the fallback paths (pages only read them)
+_EMPTY_DF = pd.DataFrame()
+_EMPTY_SCHEDULES = pd.DataFrame({
+    col: pd.array([], dtype="string") for col in ["transport_type", "line", "direction", "message"]
+})
+
+
+def as_df(tbl):
+    """Convert a cached Arrow table to pandas at the consumer (empty frame if missing)
+
+    st.cache_data hands each call its own unpickled copy, so self_destruct is safe here.
+    """
+    if tbl is None:
+        return _EMPTY_DF
+    return tbl.to_pandas(self_destruct=True, split_blocks=True)
+
+
 # Load data functions
 @st.cache_data(ttl=3600)  # Cache for 1 hour
-def load_weather_data():
-    """Load weather data from data lake"""
+@safe_load(lambda: (None, None, None), "weather data")
+def load_weather_tables():
+    """Load weather data from data lake as Arrow tables (cheaper to store in the cache)"""
     bucket_name = DATA_LAKE["bucket_name"]
 
-    try:
-        # Get current weather
-        current_df = read_parquet_from_data_lake(bucket_name, 'refined/weather/current_latest.parquet')
+    # Current weather, daily and hourly forecasts fetched in parallel
+    keys = [
+        'refined/weather/current_latest.parquet',
+        'refined/weather/daily_latest.parquet',
+        'refined/weather/hourly_latest.parquet'
+    ]
+    tables = read_many_parquet_from_data_lake(
+        bucket_name, keys, use_cache=True, reader=read_parquet_table_from_data_lake
+    )
 
-        # Get daily forecast
-        daily_df = read_parquet_from_data_lake(bucket_name, 'refined/weather/daily_latest.parquet')
+    return tuple(tables[key] for key in keys)
 
-        # Get hourly forecast
-        hourly_df = read_parquet_from_data_lake(bucket_name, 'refined/weather/hourly_latest.parquet')
 
-        return current_df, daily_df, hourly_df
-    except Exception as e:
-        st.error(f"Error loading weather data: {str(e)}")
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+def load_weather_data():
+    """Load weather data from data lake"""
+    return tuple(as_df(tbl) for tbl in load_weather_tables())
+
+@st.cache_data(ttl=3600)
+@safe_load(dict, "weather metrics")
+def load_weather_metrics():
+    """Current temperature and feels-like delta, read straight from the cached Arrow table"""
+    current_tbl = load_weather_tables()[0]
+    if current_tbl is None or current_tbl.num_rows == 0 or "temperature" not in current_tbl.column_names:
+        return {}
+    temp = current_tbl.column("temperature")[0].as_py()
+    if temp is None:
+        return {}
+    metrics = {"temp": temp}
+    if "feels_like" in current_tbl.column_names:
+        feels_like = current_tbl.column("feels_like")[0].as_py()
+        if feels_like is not None:
+            metrics["delta"] = float(feels_like - temp)
+    return metrics
 
 @st.cache_data(ttl=900)  # Cache for 15 minutes
+@safe_load(dict, "predictions")
 def load_predictions():
     """Load real-time predictions for all transport lines"""
-    try:
-        from models.enhanced_prediction_model import PredictionService
-
-        service = PredictionService()
-        if not service.initialize():
-            return {}
-
-        # Get predictions for all lines
-        lines_to_predict = [
-            {"transport_type": "metro", "line": "1"},
-            {"transport_type": "rers", "line": "A"},
-            {"transport_type": "rers", "line": "E"},
-            {"transport_type": "transilien", "line": "L"},
-            {"transport_type": "buses", "line": "144"},
-        ]
+    from models.enhanced_prediction_model import PredictionService
 
-        predictions = {}
-        for line_info in lines_to_predict:
-            key = f"{line_info['transport_type']}_{line_info['line']}"
-            prediction = service.get_transport_prediction(
-                line_info['transport_type'],
-                line_info['line']
-            )
-            if prediction:
-                predictions[key] = prediction
+    service = PredictionService()
+    if not service.initialize():
+        return {}
 
-        return predictions
+    # Get predictions for all lines
+    lines_to_predict = [
+        {"transport_type": "metro", "line": "1"},
+        {"transport_type": "rers", "line": "A"},
+        {"transport_type": "rers", "line": "E"},
+        {"transport_type": "transilien", "line": "L"},
+        {"transport_type": "buses", "line": "144"},
+    ]
 
-    except Exception as e:
-        st.error(f"Error loading predictions: {str(e)}")
-        return {}
+    predictions = {}
+    for line_info in lines_to_predict:
+        key = f"{line_info['transport_type']}_{line_info['line']}"
+        prediction = service.get_transport_prediction(
+            line_info['transport_type'],
+            line_info['line']
+        )
+        if prediction:
+            predictions[key] = prediction
+
+    return predictions
 
 
 @st.cache_data(ttl=1800)  # Cache for 30 minutes
+@safe_load(dict, "forecasts")
 def load_24h_forecasts():
     """Load 24-hour forecasts for key transport lines"""
     if not PREDICTIONS_AVAILABLE:
         return {}
 
-    try:
-        service = PredictionService()
-        if not service.initialize():
-            return {}
-
-        # Get 24h forecasts for main lines
-        main_lines = [
-            {"transport_type": "metro", "line": "1"},
-            {"transport_type": "rers", "line": "A"},
-            {"transport_type": "rers", "line": "E"},
-        ]
+    service = PredictionService()
+    if not service.initialize():
+        return {}
 
-        forecasts = {}
-        for line_info in main_lines:
-            key = f"{line_info['transport_type']}_{line_info['line']}"
-            forecast = service.get_24h_forecast(
-                line_info['transport_type'],
-                line_info['line']
-            )
-            if not forecast.empty:
-                forecasts[key] = forecast
+    # Get 24h forecasts for main lines
+    main_lines = [
+        {"transport_type": "metro", "line": "1"},
+        {"transport_type": "rers", "line": "A"},
+        {"transport_type": "rers", "line": "E"},
+    ]
 
-        return forecasts
+    forecasts = {}
+    for line_info in main_lines:
+        key = f"{line_info['transport_type']}_{line_info['line']}"
+        forecast = service.get_24h_forecast(
+            line_info['transport_type'],
+            line_info['line']
+        )
+        if not forecast.empty:
+            forecasts[key] = forecast
 
-    except Exception as e:
-        st.error(f"Error loading forecasts: {str(e)}")
-        return {}
+    return forecasts
 
 @st.cache_data(ttl=1800)  # Cache for 30 minutes (more frequent updates for transport)
 def load_transport_data():
@@ -209,39 +268,53 @@ def load_transport_data():
 
     # Try to load combined data first (most recent approach)
     try:
-        combined_schedules = read_parquet_from_data_lake(bucket_name, 'refined/transport/schedules_latest.parquet')
-        combined_traffic = read_parquet_from_data_lake(bucket_name, 'refined/transport/traffic_latest.parquet')
+        combined_schedules = read_parquet_from_data_lake(bucket_name, 'refined/transport/schedules_latest.parquet', use_cache=True)
+        combined_traffic = read_parquet_from_data_lake(bucket_name, 'refined/transport/traffic_latest.parquet', columns=TRAFFIC_STATUS_COLUMNS, use_cache=True)
 
         if not combined_schedules.empty and not combined_traffic.empty:
             st.sidebar.success("✅ Using combined transport data")
-            return combined_schedules, combined_traffic
+            return combined_schedules, prepare_traffic_status(combined_traffic)
     except Exception:
         pass
 
-    # Fallback: Load individual transport line data
-    for transport_type, lines in transport_config.items():
-        for line in lines:
-            try:
-                # Load schedules
-                schedules_key = f'refined/transport/{transport_type}_{line}_schedules_latest.parquet'
-                line_schedules = read_parquet_from_data_lake(bucket_name, schedules_key)
-                if not line_schedules.empty:
-                    all_schedules.append(line_schedules)
-
-                # Load traffic status
-                traffic_key = f'refined/transport/{transport_type}_{line}_traffic_latest.parquet'
-                line_traffic = read_parquet_from_data_lake(bucket_name, traffic_key)
-                if not line_traffic.empty:
-                    all_traffic.append(line_traffic)
+    # Fallback: Load individual transport line data (all keys fetched in parallel)
+    line_keys = [
+        (f'refined/transport/{transport_type}_{line}_schedules_latest.parquet',
+         f'refined/transport/{transport_type}_{line}_traffic_latest.parquet')
+        for transport_type, lines in transport_config.items()
+        for line in lines
+    ]
+    # One paginated listing to know which objects exist, missing keys are never fetched.
+    # If the listing fails (None), every candidate key is fetched instead
+    available_keys = list_all_keys(bucket_name, 'refined/transport/')
 
-            except Exception as e:
-                print(f"Could not load data for {transport_type} {line}: {str(e)}")
-                continue
+    def existing(keys):
+        return [key for key in keys if available_keys is None or key in available_keys]
+
+    try:
+        line_frames = read_many_parquet_from_data_lake(
+            bucket_name, existing(key for pair in line_keys for key in pair), use_cache=True
+        )
+    except Exception as e:
+        print(f"Could not load individual transport line data: {str(e)}")
+        line_frames = {}
+
+    for schedules_key, traffic_key in line_keys:
+        line_schedules = line_frames.get(schedules_key)
+        if line_schedules is not None and not line_schedules.empty:
+            all_schedules.append(line_schedules)
+
+        line_traffic = line_frames.get(traffic_key)
+        if line_traffic is not None and not line_traffic.empty:
+            all_traffic.append(line_traffic)
 
     # Try IDFM data as additional source
     try:
-        idfm_schedules = read_parquet_from_data_lake(bucket_name, 'refined/transport/idfm_schedules_latest.parquet')
-        idfm_traffic = read_parquet_from_data_lake(bucket_name, 'refined/transport/idfm_traffic_latest.parquet')
+        idfm_frames = read_many_parquet_from_data_lake(bucket_name, existing(
+            ('refined/transport/idfm_schedules_latest.parquet', 'refined/transport/idfm_traffic_latest.parquet')
+        ), use_cache=True)
+        idfm_schedules = idfm_frames.get('refined/transport/idfm_schedules_latest.parquet', _EMPTY_DF)
+        idfm_traffic = idfm_frames.get('refined/transport/idfm_traffic_latest.parquet', _EMPTY_DF)
 
         if not idfm_schedules.empty:
             all_schedules.append(idfm_schedules)
@@ -255,25 +328,25 @@ def load_transport_data():
         pass
 
     # Combine all data
-    schedules_df = pd.concat(all_schedules, ignore_index=True) if all_schedules else pd.DataFrame()
-    traffic_df = pd.concat(all_traffic, ignore_index=True) if all_traffic else pd.DataFrame()
+    schedules_df = pd.concat(all_schedules, ignore_index=True) if all_schedules else _EMPTY_SCHEDULES
+    traffic_df = pd.concat(all_traffic, ignore_index=True) if all_traffic else _EMPTY_DF
 
     try:
         # Try to load existing data
-        schedules_df = read_parquet_from_data_lake(bucket_name, 'refined/transport/schedules_latest.parquet')
-        traffic_df = read_parquet_from_data_lake(bucket_name, 'refined/transport/traffic_latest.parquet')
+        schedules_df = read_parquet_from_data_lake(bucket_name, 'refined/transport/schedules_latest.parquet', use_cache=True)
+        traffic_df = read_parquet_from_data_lake(bucket_name, 'refined/transport/traffic_latest.parquet', columns=TRAFFIC_STATUS_COLUMNS, use_cache=True)
 
         # If empty, try RATP fallback
         if schedules_df.empty:
-            schedules_df = read_parquet_from_data_lake(bucket_name, 'refined/transport/ratp_schedules_latest.parquet')
+            schedules_df = read_parquet_from_data_lake(bucket_name, 'refined/transport/ratp_schedules_latest.parquet', use_cache=True)
         if traffic_df.empty:
-            traffic_df = read_parquet_from_data_lake(bucket_name, 'refined/transport/ratp_traffic_latest.parquet')
+            traffic_df = read_parquet_from_data_lake(bucket_name, 'refined/transport/ratp_traffic_latest.parquet', columns=TRAFFIC_STATUS_COLUMNS, use_cache=True)
 
-        return schedules_df, traffic_df
+        return schedules_df, prepare_traffic_status(traffic_df)
 
     except Exception as e:
         st.error(f"Error loading transport data: {str(e)}")
-        return pd.DataFrame(), pd.DataFrame()
+        return _EMPTY_SCHEDULES, _EMPTY_DF
 
     # Data source indicator
     if not schedules_df.empty or not traffic_df.empty:
@@ -287,6 +360,41 @@ def load_transport_data():
     return schedules_df, traffic_df
 
 
+# Columns actually used by the dashboard (parquet projection)
+STATION_COLUMNS = [
+    "name", "lat", "lon", "type", "wheelchair_accessible", "elevator_available",
+    "escalator_available", "lines", "num_entrances"
+]
+TRAFFIC_STATUS_COLUMNS = ["transport_type", "line", "status", "title", "message"]
+
+
+def prepare_traffic_status(traffic_df):
+    """Trim traffic status to the dashboard columns, low-cardinality ones as categories, with status styles"""
+    if traffic_df.empty:
+        return traffic_df
+    columns = [col for col in TRAFFIC_STATUS_COLUMNS if col in traffic_df.columns]
+    traffic_df = traffic_df[columns]
+    if "status" in columns:
+        traffic_df = add_status_styles(traffic_df)
+    return traffic_df.astype({col: "category" for col in ("transport_type", "status") if col in columns})
+
+
+@st.cache_data(ttl=1800)
+def load_transport_metrics():
+    """Line, issue and departure counts for the overview, computed once per cache period"""
+    schedules_df, traffic_df = load_transport_data()
+    metrics = {"total_lines": len(traffic_df), "issues": 0, "status_counts": {}, "departures": len(schedules_df)}
+    if traffic_df.empty:
+        return metrics
+
+    # Status counts sorted by frequency, one NumPy pass over the status column
+    status_values, status_totals = np.unique(traffic_df["status"].dropna().to_numpy(dtype=str), return_counts=True)
+    order = np.argsort(-status_totals, kind="stable")
+    metrics["status_counts"] = dict(zip(status_values[order].tolist(), status_totals[order].tolist()))
+    metrics["issues"] = metrics["total_lines"] - metrics["status_counts"].get("normal", 0)
+    return metrics
+
+
 @st.cache_data(ttl=3600)
 def load_station_data():
     """Load station information from multiple sources"""
@@ -302,7 +410,7 @@ def load_station_data():
 
     for source in station_sources:
         try:
-            stations_df = read_parquet_from_data_lake(bucket_name, source)
+            stations_df = read_parquet_from_data_lake(bucket_name, source, columns=STATION_COLUMNS, use_cache=True)
             if not stations_df.empty:
                 all_stations.append(stations_df)
                 st.sidebar.info(f"📍 Loaded stations from {source.split('/')[-1]}")
@@ -314,24 +422,57 @@ def load_station_data():
         combined_stations = pd.concat(all_stations, ignore_index=True)
         # Remove duplicates based on name and coordinates
         combined_stations = combined_stations.drop_duplicates(subset=['name', 'lat', 'lon'], keep='first')
+        if "type" in combined_stations.columns:
+            combined_stations["type"] = combined_stations["type"].astype("category")
         return combined_stations
     else:
         st.sidebar.warning("⚠️ No station data available")
-        return pd.DataFrame()
+        return _EMPTY_DF
 
 
 @st.cache_data(ttl=3600)
+def load_station_index():
+    """Stations keyed by name (first occurrence wins) and the sorted names for the selectbox"""
+    stations_df = load_station_data()
+    if stations_df.empty or "name" not in stations_df.columns:
+        return {}, []
+    records = stations_df.drop_duplicates(subset="name", keep="first").to_dict(orient="records")
+    stations_by_name = {record["name"]: record for record in records}
+    return stations_by_name, sorted(stations_by_name, key=str)
+
+
+@st.cache_data(ttl=3600)
+def load_station_map_points():
+    """Stations with valid coordinates, trimmed to the map columns (filtered once per cache period)"""
+    return station_map_points(load_station_data())
+
+
+@st.cache_data(ttl=3600)
+@safe_load(dict, "traffic data")
 def load_traffic_data():
     """Load road traffic data"""
     bucket_name = DATA_LAKE["bucket_name"]
 
-    try:
-        # Get traffic data
-        traffic_data = read_json_from_data_lake(bucket_name, 'landing/traffic/traffic_ladefense_latest.json')
-        return traffic_data
-    except Exception as e:
-        st.error(f"Error loading traffic data: {str(e)}")
-        return {}
+    # Get traffic data
+    return read_json_from_data_lake(bucket_name, 'landing/traffic/traffic_ladefense_latest.json')
+
+
+QUALITY_CHECK_RE = re.compile(r"Data quality check completed:\s*(\d+)/(\d+)")
+
+
+def tail_lines(path, n=20, block=8192):
+    """Return the last n lines of a file, reading blocks backwards from the end"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        while position > 0 and data.count(b'\n') <= n:
+            read_size = min(block, position)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + data
+
+    return data.decode('utf-8', errors='replace').splitlines()[-n:]
 
 
 @st.cache_data(ttl=1800)  # Cache for 30 minutes
@@ -344,59 +485,102 @@ def load_data_quality_status():
 
     # Parse the log to extract most recent status
     try:
-        with open(log_path, 'r') as f:
-            # Get the last 20 lines
-            lines = f.readlines()[-20:]
-
-            # Extract info from log lines
-            quality_info = {}
-            for line in reversed(lines):
-                if "Data quality check completed" in line:
-                    # Extract the stats (format: x/y checks passed)
-                    stats_part = line.split("Data quality check completed:")[1].strip()
-                    checks_part = stats_part.split(" checks")[0].strip()
-                    passed, total = checks_part.split('/')
-
-                    quality_info["status"] = "Good" if int(passed) == int(total) else "Issues Detected"
-                    quality_info["passed"] = int(passed)
-                    quality_info["total"] = int(total)
-                    quality_info["timestamp"] = line.split(" - INFO - ")[0].strip()
-                    break
-
-            if not quality_info:
-                return {"status": "Unknown", "details": "No complete quality check found in logs"}
-
-            return quality_info
+        # Only the last 20 lines are read from disk
+        lines = tail_lines(log_path, 20)
+
+        # Extract info from log lines
+        quality_info = {}
+        for line in reversed(lines):
+            match = QUALITY_CHECK_RE.search(line)
+            if match:
+                # Extract the stats (format: x/y checks passed)
+                passed, total = int(match.group(1)), int(match.group(2))
+
+                quality_info["status"] = "Good" if passed == total else "Issues Detected"
+                quality_info["passed"] = passed
+                quality_info["total"] = total
+                quality_info["timestamp"] = line.split(" - INFO - ")[0].strip()
+                break
+
+        if not quality_info:
+            return {"status": "Unknown", "details": "No complete quality check found in logs"}
+
+        return quality_info
     except Exception as e:
         return {"status": "Error", "details": f"Error parsing quality logs: {str(e)}"}
 
 
 @st.cache_data(ttl=3600)
+@safe_load(dict, "IDFM raw data")
 def load_idfm_data():
     """Load raw IDFM data for additional detailed information"""
     bucket_name = DATA_LAKE["bucket_name"]
 
-    try:
-        idfm_data = read_json_from_data_lake(bucket_name, 'landing/transport/idfm_ladefense_latest.json')
-        return idfm_data
-    except Exception as e:
-        st.error(f"Error loading IDFM raw data: {str(e)}")
-        return {}
+    return read_json_from_data_lake(bucket_name, 'landing/transport/idfm_ladefense_latest.json')
+
+
+@st.cache_resource
+def get_loader_executor():
+    """Thread pool shared by all sessions to run the data loaders concurrently"""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="loader")
+
+
+def _run_with_ctx(ctx, loader):
+    """Attach the session's script context to the worker thread so st.* calls work there"""
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return loader()
+    return run
 
 
 # Main function to load all data
 def load_all_data():
     with st.spinner("Loading mobility data..."):
-        current_weather, daily_weather, hourly_weather = load_weather_data()
-        schedules_df, traffic_df = load_transport_data()
-        stations_df = load_station_data()
-        road_traffic_data = load_traffic_data()
-        quality_status = load_data_quality_status()
-        idfm_data = load_idfm_data()
+        # Loaders are independent and mostly wait on S3, run them in parallel
+        executor = get_loader_executor()
+        ctx = get_script_run_ctx()
+        loaders = {
+            "weather": load_weather_data,
+            "transport": load_transport_data,
+            "stations": load_station_data,
+            "station_points": load_station_map_points,
+            "station_index": load_station_index,
+            "weather_metrics": load_weather_metrics,
+            "transport_metrics": load_transport_metrics,
+            "road_traffic": load_traffic_data,
+            "quality": load_data_quality_status,
+            "idfm": load_idfm_data,
+            "predictions": load_predictions,
+            "forecasts": load_24h_forecasts,
+        }
+        futures = {name: executor.submit(_run_with_ctx(ctx, loader)) for name, loader in loaders.items()}
+        results = {name: future.result() for name, future in futures.items()}
+
+        current_weather, daily_weather, hourly_weather = results["weather"]
+        schedules_df, traffic_df = results["transport"]
+        stations_df = results["stations"]
+        stations_by_name, station_names = results["station_index"]
+        road_traffic_data = results["road_traffic"]
+        quality_status = results["quality"]
+        idfm_data = results["idfm"]
 
         # Add predictions to data loading
-        predictions = load_predictions()
-        forecasts = load_24h_forecasts()
+        predictions = results["predictions"]
+        forecasts = results["forecasts"]
+
+        # Data source health, computed once for the Data Quality page
+        sources_ok = {
+            "Weather": not current_weather.empty,
+            "Transport Schedules": not schedules_df.empty,
+            "Transport Status": not traffic_df.empty,
+            "Station Info": not stations_df.empty,
+            "Road Traffic": bool(road_traffic_data),
+            "IDFM Data": bool(idfm_data)
+        }
+        availability = pd.DataFrame({
+            "Data Source": list(sources_ok),
+            "Status": ["🟢 Operational" if ok else "🔴 Unavailable" for ok in sources_ok.values()]
+        })
 
         return {
             "current_weather": current_weather,
@@ -405,11 +589,17 @@ def load_all_data():
             "schedules": schedules_df,
             "traffic_status": traffic_df,
             "stations": stations_df,
+            "station_points": results["station_points"],
+            "stations_by_name": stations_by_name,
+            "weather_metrics": results["weather_metrics"],
+            "transport_metrics": results["transport_metrics"],
+            "station_names": station_names,
             "road_traffic": road_traffic_data,
             "quality_status": quality_status,
             "idfm_raw": idfm_data,
             "predictions": predictions,  # NEW
-            "forecasts": forecasts  # NEW
+            "forecasts": forecasts,  # NEW
+            "availability": availability
         }
 
 # Page configuration
@@ -489,28 +679,28 @@ if page == "Overview":
     st.title("🏢 La Défense Mobility Dashboard")
     st.subheader(f"Current Status as of {current_date} {current_time}")
 
+    # Metrics precomputed by the cached loaders
+    weather_metrics = all_data["weather_metrics"]
+    transport_metrics = all_data["transport_metrics"]
+    status_counts = transport_metrics["status_counts"]
+
     # Enhanced summary metrics
     col1, col2, col3, col4, col5 = st.columns(5)
 
     with col1:
-        if not all_data["current_weather"].empty:
-            temp = all_data['current_weather']['temperature'].iloc[0]
-            feels_like = all_data['current_weather']['feels_like'].iloc[0]
+        if weather_metrics:
             st.metric(
                 "🌡️ Temperature",
-                f"{temp}°C",
-                f"{feels_like - temp:+.1f}°C feels like"
+                f"{weather_metrics['temp']}°C",
+                f"{weather_metrics['delta']:+.1f}°C feels like" if "delta" in weather_metrics else None
             )
         else:
             st.metric("🌡️ Temperature", "N/A")
 
     with col2:
-        if not all_data["traffic_status"].empty:
-            # Count lines with issues by status
-            status_counts = all_data["traffic_status"]["status"].value_counts()
-            normal_lines = status_counts.get("normal", 0)
-            total_lines = len(all_data["traffic_status"])
-            issues = total_lines - normal_lines
+        if transport_metrics["total_lines"]:
+            total_lines = transport_metrics["total_lines"]
+            issues = transport_metrics["issues"]
 
             st.metric(
                 "🚊 Transport Lines",
@@ -525,9 +715,12 @@ if page == "Overview":
         predictions = all_data.get("predictions", {})
         if predictions:
             # Calculate average reliability across all lines
-            reliabilities = [pred.get('reliability', 0) for pred in predictions.values() if 'reliability' in pred]
-            if reliabilities:
-                avg_reliability = sum(reliabilities) / len(reliabilities)
+            reliabilities = np.fromiter(
+                (pred['reliability'] for pred in predictions.values() if 'reliability' in pred),
+                dtype=np.float64
+            )
+            if reliabilities.size:
+                avg_reliability = reliabilities.mean()
                 st.metric(
                     "🔮 Avg Reliability",
                     f"{avg_reliability:.1%}",
@@ -541,9 +734,9 @@ if page == "Overview":
     with col4:
         if not all_data["stations"].empty:
             total_stations = len(all_data["stations"])
-            accessible_stations = len(all_data["stations"][
-                all_data["stations"].get("wheelchair_accessible", "unknown") == "yes"
-            ]) if "wheelchair_accessible" in all_data["stations"].columns else 0
+            accessible_stations = int(
+                count_availability(all_data["stations"]["wheelchair_accessible"])[0]
+            ) if "wheelchair_accessible" in all_data["stations"].columns else 0
 
             st.metric(
                 "🚉 Stations",
@@ -564,7 +757,7 @@ if page == "Overview":
 
     # Map of La Défense area
     st.markdown("---")
-    render_station_map(all_data["stations"])
+    render_station_map(all_data["station_points"])
 
     # Transport status summary
     col1, col2 = st.columns(2)
@@ -572,10 +765,8 @@ if page == "Overview":
     with col1:
         st.subheader("🚊 Transport Status Summary")
         if not all_data["traffic_status"].empty:
-            status_summary = all_data["traffic_status"]["status"].value_counts()
-
             # Create a mini status display
-            for status, count in status_summary.items():
+            for status, count in status_counts.items():
                 status_display = {
                     "normal": "✅ Normal Service",
                     "minor": "⚠️ Minor Issues",
@@ -995,7 +1186,7 @@ elif page == "Weather Impact":
         st.markdown("---")
         st.subheader("🚊 Transport Recommendations by Weather")
 
-        current = all_data["current_weather"].iloc[0]
+        current = all_data["current_weather"].head(1).to_dict('records')[0]
 
         # SAFE extraction of weather values (FIXES THE ERROR)
         precip = safe_get_weather_value(current, 'precipitation', 0)
@@ -1219,7 +1410,7 @@ elif page == "Station Information":
     tab1, tab2 = st.tabs(["🔍 Station Details", "📊 Station Statistics"])
 
     with tab1:
-        render_station_details(all_data["stations"])
+        render_station_details(all_data["stations_by_name"], all_data["station_names"])
 
 
     with tab2:
@@ -1294,20 +1485,7 @@ elif page == "Data Quality":
         # Data source health
         st.markdown("### 🏥 Data Source Health")
 
-        data_sources = {
-            "Weather": not all_data["current_weather"].empty,
-            "Transport Schedules": not all_data["schedules"].empty,
-            "Transport Status": not all_data["traffic_status"].empty,
-            "Station Info": not all_data["stations"].empty,
-            "Road Traffic": bool(all_data["road_traffic"]),
-            "IDFM Data": bool(all_data["idfm_raw"])
-        }
-
-        for source, available in data_sources.items():
-            status_icon = "🟢" if available else "🔴"
-            status_text = "Operational" if available else "Unavailable"
-
-            st.markdown(f"{status_icon} **{source}**: {status_text}")
+        st.dataframe(all_data["availability"], hide_index=True, use_container_width=True)
 
     # Detailed quality information
     # st.markdown("---")
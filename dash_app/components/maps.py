@@ -2,7 +2,7 @@
 Map visualization components for the La Défense mobility dashboard
 """
 import streamlit as st
-import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 import sys
@@ -15,39 +15,74 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 from configuration.config import LADEFENSE_COORDINATES
+from dash_app.components.plotly_json import enable_orjson_serialization
 
-def render_station_map(stations_df):
-    """Render a map of stations in La Défense"""
-    st.subheader("La Défense Transportation Hub")
+# Faster figure serialization when orjson is installed
+enable_orjson_serialization()
+
+# Columns the station map needs, everything else is dropped by station_map_points
+STATION_MAP_COLUMNS = ["name", "lat", "lon", "type", "wheelchair_accessible", "elevator_available"]
+STATION_HOVER_COLUMNS = ["type", "wheelchair_accessible", "elevator_available"]
+
+
+def station_map_points(stations_df):
+    """Keep only stations with valid coordinates and the columns used by the map"""
+    if stations_df.empty or "lat" not in stations_df.columns or "lon" not in stations_df.columns:
+        return pd.DataFrame(columns=STATION_MAP_COLUMNS)
+
+    columns = [col for col in STATION_MAP_COLUMNS if col in stations_df.columns]
+    valid = (stations_df["lat"] != 0) & (stations_df["lon"] != 0)
+    return stations_df.loc[valid, columns].reset_index(drop=True)
+
+
+@st.cache_data(ttl=3600)
+def build_station_map(station_points):
+    """Build the station map figure, cached as a dict on the station points"""
+    hover_columns = [col for col in STATION_HOVER_COLUMNS if col in station_points.columns]
+    hover_template = "<b>%{text}</b>" + "".join(
+        f"<br>{col}=%{{customdata[{i}]}}" for i, col in enumerate(hover_columns)
+    ) + "<extra></extra>"
 
-    # Create a figure with stations
-    if not stations_df.empty:
-        # Filter stations with valid coordinates
-        valid_stations = stations_df[(stations_df["lat"] != 0) & (stations_df["lon"] != 0)]
-
-        if not valid_stations.empty:
-            fig = px.scatter_mapbox(
-                valid_stations,
-                lat="lat",
-                lon="lon",
-                hover_name="name",
-                hover_data=["type", "wheelchair_accessible", "elevator_available"],
-                color="type",
-                size_max=15,
-                zoom=14,
-                height=500
-            )
-
-            fig.update_layout(
-                mapbox_style="open-street-map",
-                margin={"r": 0, "t": 0, "l": 0, "b": 0}
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.warning("No stations with valid coordinates found")
+    # One Scattermapbox trace per station type (same legend as before, no express overhead)
+    if "type" in station_points.columns:
+        groups = station_points.groupby("type", sort=False, observed=True)
     else:
-        st.warning("No station data available to display on the map")
+        groups = [("stations", station_points)]
+
+    fig = go.Figure()
+    for station_type, group in groups:
+        fig.add_trace(go.Scattermapbox(
+            lat=group["lat"],
+            lon=group["lon"],
+            mode="markers",
+            name=str(station_type),
+            text=group["name"] if "name" in group.columns else None,
+            customdata=group[hover_columns].to_numpy() if hover_columns else None,
+            hovertemplate=hover_template,
+            marker=dict(size=9)
+        ))
+
+    fig.update_layout(
+        mapbox=dict(
+            style="open-street-map",
+            zoom=14,
+            center=dict(lat=float(station_points["lat"].mean()), lon=float(station_points["lon"].mean()))
+        ),
+        height=500,
+        margin={"r": 0, "t": 0, "l": 0, "b": 0}
+    )
+    return fig.to_dict()
+
+
+def render_station_map(station_points):
+    """Render a map of stations in La Défense (expects station_map_points output)"""
+    st.subheader("La Défense Transportation Hub")
+
+    if station_points.empty:
+        st.warning("No stations with valid coordinates found")
+        return
+
+    st.plotly_chart(build_station_map(station_points), use_container_width=True)
 
 
 # def render_traffic_heatmap(traffic_data=None):
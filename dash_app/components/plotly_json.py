@@ -0,0 +1,15 @@
+"""
+Plotly figure serialization settings shared by the dashboard components
+"""
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def enable_orjson_serialization():
+    """Use orjson for plotly figure serialization when installed (applied once per process)"""
+    import plotly.io as pio
+    try:
+        import orjson  # noqa: F401
+        pio.json.config.default_engine = "orjson"
+    except ImportError:
+        pass
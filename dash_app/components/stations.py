@@ -3,31 +3,43 @@ Station information components for the La Défense mobility dashboard
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 
+AVAILABILITY_LEVELS = ["yes", "no", "unknown"]
 
-def render_station_details(stations_df, selected_station=None):
-    """Render detailed station information"""
+
+def count_availability(values):
+    """Count yes/no/unknown values in one pass over categorical codes"""
+    codes = pd.Categorical(values, categories=AVAILABILITY_LEVELS).codes
+    return np.bincount(codes[codes >= 0], minlength=len(AVAILABILITY_LEVELS))
+
+
+# Fragment: a station selection reruns only this block
+@st.fragment
+def render_station_details(stations_by_name, station_names, selected_station=None):
+    """Render detailed station information (stations indexed by name, see load_station_index)"""
     st.subheader("Station Information")
 
-    if not stations_df.empty:
+    if stations_by_name:
         # Check if we have at least name column
-        if "name" in stations_df.columns:
+        if station_names:
             # Station selection
             if selected_station is None:
                 selected_station = st.selectbox(
                     "Select a station",
-                    stations_df["name"].unique()
+                    station_names
                 )
 
-            # Filter for selected station
-            station_data = stations_df[stations_df["name"] == selected_station].iloc[0]
+            # Direct lookup of the selected station
+            station_data = stations_by_name[selected_station]
 
             # Display station details
             st.subheader(f"{selected_station} Details")
 
             # Check which columns are available
-            columns = station_data.index.tolist()
+            columns = station_data.keys()
 
             col1, col2 = st.columns(2)
 
@@ -45,24 +57,18 @@ def render_station_details(stations_df, selected_station=None):
             if "lat" in columns and "lon" in columns and station_data["lat"] != 0 and station_data["lon"] != 0:
                 lat, lon = station_data["lat"], station_data["lon"]
 
-                fig = px.scatter_mapbox(
-                    pd.DataFrame([{
-                        "lat": lat,
-                        "lon": lon,
-                        "name": selected_station,
-                        "size": 1
-                    }]),
-                    lat="lat",
-                    lon="lon",
-                    hover_name="name",
-                    size="size",
-                    size_max=15,
-                    zoom=15,
-                    height=400
-                )
+                fig = go.Figure(go.Scattermapbox(
+                    lat=[lat],
+                    lon=[lon],
+                    mode="markers",
+                    text=[selected_station],
+                    hoverinfo="text",
+                    marker=dict(size=15)
+                ))
 
                 fig.update_layout(
-                    mapbox_style="open-street-map",
+                    mapbox=dict(style="open-street-map", zoom=15, center=dict(lat=float(lat), lon=float(lon))),
+                    height=400,
                     margin={"r": 0, "t": 0, "l": 0, "b": 0}
                 )
 
@@ -84,17 +90,14 @@ def render_accessibility_overview(stations_df):
         if "wheelchair_accessible" in stations_df.columns:
             # Calculate accessibility statistics
             total_stations = len(stations_df)
-            accessible_stations = len(stations_df[stations_df["wheelchair_accessible"] == "yes"])
+            wheelchair_counts = count_availability(stations_df["wheelchair_accessible"])
+            accessible_stations = int(wheelchair_counts[0])
             accessibility_percentage = (accessible_stations / total_stations) * 100 if total_stations > 0 else 0
 
             # Create a simple pie chart
             accessibility_df = pd.DataFrame({
                 "status": ["Accessible", "Not Accessible", "Unknown"],
-                "count": [
-                    len(stations_df[stations_df["wheelchair_accessible"] == "yes"]),
-                    len(stations_df[stations_df["wheelchair_accessible"] == "no"]),
-                    len(stations_df[stations_df["wheelchair_accessible"] == "unknown"])
-                ]
+                "count": wheelchair_counts
             })
 
             fig = px.pie(
@@ -116,11 +119,7 @@ def render_accessibility_overview(stations_df):
             if "elevator_available" in stations_df.columns:
                 elevator_df = pd.DataFrame({
                     "status": ["Available", "Not Available", "Unknown"],
-                    "count": [
-                        len(stations_df[stations_df["elevator_available"] == "yes"]),
-                        len(stations_df[stations_df["elevator_available"] == "no"]),
-                        len(stations_df[stations_df["elevator_available"] == "unknown"])
-                    ]
+                    "count": count_availability(stations_df["elevator_available"])
                 })
 
                 fig = px.pie(
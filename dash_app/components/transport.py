@@ -4,6 +4,8 @@ Updated to support Metro, RER A/E, Transilien L, and multiple bus lines
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
 import plotly.express as px
 import plotly.graph_objects as go
 
@@ -71,23 +73,105 @@ def get_transport_color(transport_type, line):
     return colors.get((transport_type, line), "#666666")  # Default gray
 
 
+TRANSPORT_GROUP_NAMES = {
+    "metro": "🚇 Metro",
+    "rers": "🚄 RER",
+    "transilien": "🚂 Transilien",
+    "buses": "🚌 Bus",
+    "idfm": "🚈 IDFM"
+}
+
+# status -> (border color, icon), anything unknown is shown as critical
+STATUS_STYLES = {
+    "normal": ("#28a745", "✅"),   # Green
+    "minor": ("#ffc107", "⚠️"),    # Yellow
+    "major": ("#fd7e14", "🚨"),    # Orange
+}
+CRITICAL_STYLE = ("#dc3545", "❌")  # Red
+
+
+def add_status_styles(traffic_status_df):
+    """Add status_color / status_icon columns with one branchless np.select over the status values"""
+    status = traffic_status_df["status"].to_numpy(dtype=object)
+    conditions = [status == name for name in STATUS_STYLES]
+    colors = np.array([style[0] for style in STATUS_STYLES.values()], dtype=object)
+    icons = np.array([style[1] for style in STATUS_STYLES.values()], dtype=object)
+    return traffic_status_df.assign(
+        status_color=np.select(conditions, colors, default=CRITICAL_STYLE[0]),
+        status_icon=np.select(conditions, icons, default=CRITICAL_STYLE[1])
+    )
+
+
+def build_status_cards_html(lines_df):
+    """Build the HTML of all status cards of a group in one vectorized string concat"""
+    # Styles are normally precomputed at load time (add_status_styles)
+    if "status_color" not in lines_df.columns:
+        lines_df = add_status_styles(lines_df)
+    status_color = lines_df["status_color"]
+    status_icon = lines_df["status_icon"]
+
+    pairs = list(zip(lines_df["transport_type"], lines_df["line"]))
+    line_color = pd.Series([get_transport_color(t, l) for t, l in pairs], index=lines_df.index)
+    display_name = pd.Series([get_transport_display_name(t, l) for t, l in pairs], index=lines_df.index)
+
+    if "title" in lines_df.columns:
+        title = lines_df["title"].fillna("Service Information").astype(str)
+    else:
+        title = "Service Information"
+    if "message" in lines_df.columns:
+        message = lines_df["message"].fillna("No additional information").astype(str)
+    else:
+        message = "No additional information"
+
+    cards = (
+        '<div style="border-left: 5px solid ' + status_color + '; padding: 10px; margin-bottom: 10px; '
+        'background-color: #f8f9fa; border-radius: 0 5px 5px 0;">'
+        '<div style="display: flex; align-items: center; margin-bottom: 5px;">'
+        '<span style="background-color: ' + line_color + '; color: white; padding: 2px 8px; '
+        'border-radius: 15px; font-weight: bold; font-size: 0.8em; margin-right: 10px;">'
+        + display_name + '</span>'
+        '<span style="font-size: 1.1em;">' + status_icon + '</span>'
+        '<strong style="margin-left: 5px;">' + title + '</strong></div>'
+        '<p style="margin: 0; color: #666; font-size: 0.9em;">' + message + '</p></div>'
+    )
+    return cards.str.cat(sep="")
+
+
+SCHEDULE_COLUMN_NAMES = {
+    "direction": "Direction",
+    "destination": "Destination",
+    "message": "Information"
+}
+
+
+def schedule_display_table(schedules_df, columns):
+    """Arrow table with the line label and the selected schedule columns, renamed for display
+
+    Streamlit renders Arrow tables as is, no pandas copy/rename/transcode on each rerun.
+    """
+    line_names = [
+        get_transport_display_name(t, l)
+        for t, l in zip(schedules_df["transport_type"], schedules_df["line"])
+    ]
+    arrays = [pa.array(line_names, type=pa.string())]
+    names = ["Line"]
+    for source, label in columns:
+        arrays.append(pa.Array.from_pandas(schedules_df[source]))
+        names.append(label)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
 def render_transport_status(traffic_status_df):
     """Render transport lines status information with improved organization"""
     st.subheader("🚊 Transport Lines Status")
 
     if not traffic_status_df.empty:
-        # Group by transport type for better organization
-        transport_groups = {
-            "🚇 Metro": traffic_status_df[traffic_status_df["transport_type"] == "metro"],
-            "🚄 RER": traffic_status_df[traffic_status_df["transport_type"] == "rers"],
-            "🚂 Transilien": traffic_status_df[traffic_status_df["transport_type"] == "transilien"],
-            "🚌 Bus": traffic_status_df[traffic_status_df["transport_type"] == "buses"],
-            "🚈 IDFM": traffic_status_df[traffic_status_df["transport_type"] == "idfm"]
-        }
+        # Group by transport type for better organization (single pass)
+        transport_groups = dict(tuple(traffic_status_df.groupby("transport_type", sort=False, observed=True)))
 
         # Count total lines with issues
         total_lines = len(traffic_status_df)
-        normal_lines = len(traffic_status_df[traffic_status_df["status"] == "normal"])
+        normal_lines = int(traffic_status_df["status"].eq("normal").sum())
 
         # Summary metrics
         col1, col2, col3 = st.columns(3)
@@ -99,56 +183,12 @@ def render_transport_status(traffic_status_df):
             issues = total_lines - normal_lines
             st.metric("Lines with Issues", issues, delta=f"-{issues}" if issues > 0 else "0")
 
-        # Display by transport type
-        for transport_name, group_df in transport_groups.items():
-            if not group_df.empty:
+        # Display by transport type, one markdown element per group
+        for transport_type, transport_name in TRANSPORT_GROUP_NAMES.items():
+            group_df = transport_groups.get(transport_type)
+            if group_df is not None and not group_df.empty:
                 with st.expander(f"{transport_name} ({len(group_df)} lines)", expanded=len(group_df) <= 3):
-                    for _, line in group_df.iterrows():
-                        # Determine status color and icon
-                        if line["status"] == "normal":
-                            status_color = "#28a745"  # Green
-                            status_icon = "✅"
-                        elif line["status"] == "minor":
-                            status_color = "#ffc107"  # Yellow
-                            status_icon = "⚠️"
-                        elif line["status"] == "major":
-                            status_color = "#fd7e14"  # Orange
-                            status_icon = "🚨"
-                        else:  # critical
-                            status_color = "#dc3545"  # Red
-                            status_icon = "❌"
-
-                        # Get transport color for line badge
-                        line_color = get_transport_color(line["transport_type"], line["line"])
-                        display_name = get_transport_display_name(line["transport_type"], line["line"])
-
-                        st.markdown(
-                            f"""
-                            <div style="
-                                border-left: 5px solid {status_color}; 
-                                padding: 10px; 
-                                margin-bottom: 10px; 
-                                background-color: #f8f9fa;
-                                border-radius: 0 5px 5px 0;
-                            ">
-                                <div style="display: flex; align-items: center; margin-bottom: 5px;">
-                                    <span style="
-                                        background-color: {line_color}; 
-                                        color: white; 
-                                        padding: 2px 8px; 
-                                        border-radius: 15px; 
-                                        font-weight: bold; 
-                                        font-size: 0.8em;
-                                        margin-right: 10px;
-                                    ">{display_name}</span>
-                                    <span style="font-size: 1.1em;">{status_icon}</span>
-                                    <strong style="margin-left: 5px;">{line.get('title', 'Service Information')}</strong>
-                                </div>
-                                <p style="margin: 0; color: #666; font-size: 0.9em;">{line.get('message', 'No additional information')}</p>
-                            </div>
-                            """,
-                            unsafe_allow_html=True
-                        )
+                    st.markdown(build_status_cards_html(group_df), unsafe_allow_html=True)
     else:
         st.info("No transport status information available at this time")
 
@@ -169,19 +209,15 @@ def render_schedules(schedules_df):
                 "Filter by Transport Type",
                 options=transport_types,
                 default=transport_types,
-                format_func=lambda x: {
-                    "metro": "🚇 Metro",
-                    "rers": "🚄 RER",
-                    "transilien": "🚂 Transilien",
-                    "buses": "🚌 Bus",
-                    "idfm": "🚈 IDFM"
-                }.get(x, x)
+                format_func=lambda x: TRANSPORT_GROUP_NAMES.get(x, x)
             )
 
+        # Transport type mask computed once, reused for the line options and the final filter
+        type_mask = schedules_df["transport_type"].isin(selected_types)
+
         with filter_col2:
             # Get lines for selected transport types
-            filtered_df = schedules_df[schedules_df["transport_type"].isin(selected_types)]
-            available_lines = sorted(filtered_df["line"].unique()) if not filtered_df.empty else []
+            available_lines = sorted(schedules_df.loc[type_mask, "line"].unique()) if type_mask.any() else []
 
             selected_lines = st.multiselect(
                 "Filter by Line",
@@ -191,59 +227,29 @@ def render_schedules(schedules_df):
 
         # Apply filters
         if selected_types and selected_lines:
-            filtered_schedules = schedules_df[
-                (schedules_df["transport_type"].isin(selected_types)) &
-                (schedules_df["line"].isin(selected_lines))
-            ]
+            filtered_schedules = schedules_df[type_mask & schedules_df["line"].isin(selected_lines)]
         else:
             filtered_schedules = pd.DataFrame()
 
         if not filtered_schedules.empty:
-            # Group by transport type for organized display
-            transport_groups = filtered_schedules.groupby("transport_type")
+            # Group by transport type for organized display (one linear pass)
+            transport_groups = filtered_schedules.groupby("transport_type", sort=False, observed=True)
 
             for transport_type, group in transport_groups:
-                transport_display = {
-                    "metro": "🚇 Metro",
-                    "rers": "🚄 RER",
-                    "transilien": "🚂 Transilien",
-                    "buses": "🚌 Bus",
-                    "idfm": "🚈 IDFM"
-                }.get(transport_type, transport_type)
+                transport_display = TRANSPORT_GROUP_NAMES.get(transport_type, transport_type)
 
                 with st.expander(f"{transport_display} Schedules", expanded=True):
-                    # Create a clean display dataframe
-                    display_df = group.copy()
-                    display_df["Transport"] = display_df.apply(
-                        lambda row: get_transport_display_name(row["transport_type"], row["line"]),
-                        axis=1
-                    )
-
-                    # Select and rename columns for display
-                    columns_to_show = ["Transport", "direction", "destination", "message"]
-                    available_columns = [col for col in columns_to_show if col in display_df.columns]
-
-                    if "destination" not in display_df.columns and "message" in display_df.columns:
-                        # Use message as destination if destination not available
-                        display_df["destination"] = display_df["message"]
-                        available_columns = ["Transport", "direction", "destination"]
-
-                    display_df_clean = display_df[available_columns].copy()
-
-                    # Rename columns for better display
-                    column_renames = {
-                        "Transport": "Line",
-                        "direction": "Direction",
-                        "destination": "Destination",
-                        "message": "Information"
-                    }
-
-                    display_df_clean = display_df_clean.rename(columns={
-                        col: column_renames.get(col, col) for col in display_df_clean.columns
-                    })
+                    # Select columns for display, message stands in for a missing destination
+                    if "destination" in group.columns:
+                        columns = [(col, SCHEDULE_COLUMN_NAMES[col])
+                                   for col in ["direction", "destination", "message"] if col in group.columns]
+                    else:
+                        columns = [(col, label) for col, label in
+                                   [("direction", "Direction"), ("message", "Destination")]
+                                   if col in group.columns]
 
                     st.dataframe(
-                        display_df_clean,
+                        schedule_display_table(group, columns),
                         use_container_width=True,
                         hide_index=True
                     )
@@ -256,28 +262,17 @@ def render_schedules(schedules_df):
 def render_schedule_summary(schedules_df):
     """Render a summary of next departures for the overview page"""
     if not schedules_df.empty:
-        # Limit to next 10 departures and add transport colors
-        summary_df = schedules_df.head(10).copy()
-
-        # Add formatted transport line
-        summary_df["Line"] = summary_df.apply(
-            lambda row: get_transport_display_name(row["transport_type"], row["line"]),
-            axis=1
-        )
+        # Limit to next 10 departures
+        summary_df = schedules_df.head(10)
 
         # Select columns for summary display
         if "destination" in summary_df.columns:
-            summary_columns = ["Line", "direction", "destination"]
-            display_names = {"direction": "Direction", "destination": "Destination"}
+            summary_columns = [("direction", "Direction"), ("destination", "Destination")]
         else:
-            summary_columns = ["Line", "direction", "message"]
-            display_names = {"direction": "Direction", "message": "Information"}
-
-        summary_display = summary_df[summary_columns].copy()
-        summary_display = summary_display.rename(columns=display_names)
+            summary_columns = [("direction", "Direction"), ("message", "Information")]
 
         st.dataframe(
-            summary_display,
+            schedule_display_table(summary_df, summary_columns),
             use_container_width=True,
             hide_index=True
         )
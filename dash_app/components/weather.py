@@ -1,55 +1,169 @@
+import functools
 import streamlit as st
-import plotly.express as px
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-
-
-def safe_get_weather_value(current_data, key, default=0):
-    """Safely extract weather values with None handling"""
-    value = current_data.get(key, default)
-
-    # Handle None, NaN, or empty string values
-    if value is None or value == "" or str(value).lower() in ['none', 'nan', 'null', 'n/a']:
-        return default
-
-    # Convert to numeric if possible
-    try:
-        return float(value)
-    except (ValueError, TypeError):
-        return default
+from dash_app.components.plotly_json import enable_orjson_serialization
+
+
+def import_plotly_go():
+    """Import plotly.graph_objects on first chart render, using orjson for figure serialization when installed"""
+    import plotly.graph_objects as go
+    enable_orjson_serialization()
+    return go
+
+
+@st.cache_data(ttl=3600)
+def build_temperature_forecast(plot_data, date_col, temp_columns, temp_avg_col):
+    """Build the temperature forecast figure, cached as a dict on the plotted data"""
+    go = import_plotly_go()
+    dates = plot_data[date_col].to_numpy()
+    fig = go.Figure()
+    for col in temp_columns:
+        fig.add_scatter(
+            x=dates,
+            y=plot_data[col].to_numpy(),
+            mode="lines",
+            name=col,
+            line=dict(color="yellow" if col == temp_avg_col else None)
+        )
+
+    fig.update_layout(
+        title="Temperature Forecast (°C)",
+        xaxis_title="Date",
+        yaxis_title="Temperature (°C)",
+        legend_title_text="Type",
+        hovermode="x unified",
+        height=400
+    )
+    return fig.to_dict()
+
+
+@st.cache_data(ttl=3600)
+def build_precipitation_forecast(plot_data, date_col, color_col):
+    """Build the precipitation forecast figure, cached as a dict on the plotted data"""
+    go = import_plotly_go()
+    fig = go.Figure(go.Bar(
+        x=plot_data[date_col].to_numpy(),
+        y=plot_data["precipitation"].to_numpy(),
+        marker=dict(
+            color=plot_data[color_col].to_numpy(),
+            colorscale="Plasma",
+            colorbar=dict(title=color_col)
+        )
+    ))
+    fig.update_layout(
+        title="Precipitation Forecast (mm)",
+        xaxis_title="Date",
+        yaxis_title="Precipitation (mm)",
+        height=300
+    )
+    return fig.to_dict()
+
+
+# Set to True to always show the forecast diagnostics, regardless of the debug toggle
+DEBUG = False
+
+
+def dbg(msg_fn):
+    """Write a debug message, only formatting it when weather debugging is enabled"""
+    if DEBUG or st.session_state.get("show_weather_debug", False):
+        st.write(msg_fn())
+
+
+# Numeric fields read from the current weather record, with their fallback values
+# (NaN for feels_like: it falls back to the temperature once that is known)
+CURRENT_WEATHER_KEYS = ['temperature', 'feels_like', 'humidity', 'wind_speed',
+                        'precipitation', 'precipitation_probability', 'visibility']
+CURRENT_WEATHER_DEFAULTS = np.array([15, np.nan, 50, 0, 0, 0, 10], dtype=np.float64)
+
+
+def normalize_weather(row, keys, defaults):
+    """Extract several numeric weather values in one vectorized pass, using defaults for missing/invalid ones"""
+    raw = pd.Series(row, dtype=object).reindex(keys)
+    nums = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=np.float64)
+    return np.where(np.isnan(nums), defaults, nums)
+
+
+@functools.lru_cache(maxsize=32)
+def classify_columns(cols):
+    """Map a daily weather schema (tuple of column names) to the roles used for plotting"""
+    date_col = next((col for col in ['date', 'datetime', 'Date', 'DATE'] if col in cols), None)
+
+    temp_avg_col = None
+    temp_all = []
+    date_candidates = []
+    for col in cols:
+        col_lower = col.lower()
+        if any(x in col_lower for x in ['tempavg', 'temperature_avg', 'temp_avg', 'avg_temp']):
+            temp_avg_col = col
+        if 'temp' in col_lower:
+            temp_all.append(col)
+        if any(x in col_lower for x in ['date', 'time']):
+            date_candidates.append(col)
+
+    return {
+        'date': date_col,
+        'temp_avg': temp_avg_col,
+        'temp_all': temp_all,
+        'date_candidates': date_candidates
+    }
+
+
+@st.cache_data
+def summarize_daily_weather(daily_weather):
+    """Compute the daily weather debug summary (schema, temperature stats, sample rows)"""
+    columns = daily_weather.columns
+    temp_stats = {}
+    for col in classify_columns(tuple(columns))['temp_all']:
+        values = daily_weather[col].dropna()
+        temp_stats[col] = {
+            "min": values.min(), "max": values.max(), "mean": values.mean()
+        } if len(values) > 0 else None
+
+    return {
+        "columns": list(columns),
+        "dtypes": daily_weather.dtypes.astype(str).to_dict(),
+        "temp_stats": temp_stats,
+        "sample": daily_weather.head(3)
+    }
+
+
+@st.cache_data
+def parse_dates(values, errors='raise'):
+    """Convert a date column to datetime64, memoized on the column contents across reruns"""
+    return pd.to_datetime(values, errors=errors, cache=True)
 
 
 def render_weather_section(current_weather, daily_weather, hourly_weather):
     """Enhanced weather section with debugging and safe data handling"""
     st.subheader("Weather Conditions")
 
-    # Debug information (expandable)
-    with st.expander("🔍 Debug Weather Data", expanded=False):
+    # Debug information (computed only when explicitly requested)
+    if st.checkbox("🔍 Show weather debug", key="show_weather_debug", value=False):
         st.write("**Data Availability:**")
         st.write(f"- Current weather: {len(current_weather)} records")
         st.write(f"- Daily weather: {len(daily_weather)} records")
         st.write(f"- Hourly weather: {len(hourly_weather)} records")
 
         if not daily_weather.empty:
+            debug_info = summarize_daily_weather(daily_weather)
+
             st.write("**Daily Weather Info:**")
-            st.write(f"- Columns: {list(daily_weather.columns)}")
-            st.write(f"- Data types: {daily_weather.dtypes.to_dict()}")
+            st.write(f"- Columns: {debug_info['columns']}")
+            st.write(f"- Data types: {debug_info['dtypes']}")
 
             # Check temperature data specifically
-            temp_cols = [col for col in daily_weather.columns if 'temp' in col.lower()]
-            st.write(f"- Temperature columns found: {temp_cols}")
-
-            if temp_cols:
-                for col in temp_cols:
-                    values = daily_weather[col].dropna()
-                    if len(values) > 0:
-                        st.write(f"  - {col}: min={values.min():.1f}, max={values.max():.1f}, mean={values.mean():.1f}")
-                    else:
-                        st.write(f"  - {col}: NO DATA")
+            st.write(f"- Temperature columns found: {list(debug_info['temp_stats'])}")
+
+            for col, stats in debug_info['temp_stats'].items():
+                if stats:
+                    st.write(f"  - {col}: min={stats['min']:.1f}, max={stats['max']:.1f}, mean={stats['mean']:.1f}")
+                else:
+                    st.write(f"  - {col}: NO DATA")
 
             st.write("**Sample Daily Data:**")
-            st.dataframe(daily_weather.head(3))
+            st.dataframe(debug_info['sample'])
 
     # Check if we have valid data
     has_current = not current_weather.empty
@@ -58,21 +172,24 @@ def render_weather_section(current_weather, daily_weather, hourly_weather):
 
     if has_current:
         # Current weather display with SAFE value extraction
-        current = current_weather.iloc[0]
+        # Single plain dict instead of a boxed object-dtype Series for the first row
+        current = current_weather.head(1).to_dict('records')[0]
+
+        temp, feels_like, humidity, wind_speed, precip, precip_prob, visibility = normalize_weather(
+            current, CURRENT_WEATHER_KEYS, CURRENT_WEATHER_DEFAULTS
+        ).tolist()
+        if np.isnan(feels_like):
+            feels_like = temp
 
         cols = st.columns(3)
 
         with cols[0]:
-            temp = safe_get_weather_value(current, 'temperature', 15)
-            feels_like = safe_get_weather_value(current, 'feels_like', temp)
             st.metric("Temperature", f"{temp}°C",
                       delta=f"{feels_like - temp:+.1f}°C feels like" if feels_like != temp else None)
 
-            humidity = safe_get_weather_value(current, 'humidity', 50)
             st.metric("Humidity", f"{humidity}%")
 
         with cols[1]:
-            wind_speed = safe_get_weather_value(current, 'wind_speed', 0)
             st.metric("Wind", f"{wind_speed} km/h")
 
             conditions = current.get('conditions', 'Unknown')
@@ -81,10 +198,8 @@ def render_weather_section(current_weather, daily_weather, hourly_weather):
             st.metric("Conditions", conditions)
 
         with cols[2]:
-            precip = safe_get_weather_value(current, 'precipitation', 0)
             st.metric("Precipitation", f"{precip} mm")
 
-            precip_prob = safe_get_weather_value(current, 'precipitation_probability', 0)
             st.metric("Precipitation Probability", f"{precip_prob}%")
 
         # Display weather impact on mobility with SAFE calculations
@@ -101,7 +216,7 @@ def render_weather_section(current_weather, daily_weather, hourly_weather):
         elif wind_speed > 40:  # High winds
             impact_factor = 1.4
             impact_description = "High winds may affect high-sided vehicles and outdoor waiting conditions."
-        elif safe_get_weather_value(current, 'visibility', 10) < 3:  # Fog
+        elif visibility < 3:  # Fog
             impact_factor = 1.5
             impact_description = "Low visibility conditions may significantly slow traffic."
 
@@ -116,27 +231,17 @@ def render_weather_section(current_weather, daily_weather, hourly_weather):
     # ENHANCED forecast display with robust error handling
     if has_daily and len(daily_weather) > 0:
         with st.expander("Weather Forecast", expanded=True):  # Expanded for debugging
-            st.write(f"📊 Displaying forecast for {len(daily_weather)} days")
-
-            # Column detection
-            temp_avg_col = None
-            date_col = None
-
-            # Find temperature columns with multiple naming patterns
-            for col in daily_weather.columns:
-                col_lower = col.lower()
-                if any(x in col_lower for x in ['tempavg', 'temperature_avg', 'temp_avg', 'avg_temp']):
-                    temp_avg_col = col
+            dbg(lambda: f"📊 Displaying forecast for {len(daily_weather)} days")
 
-            # Find date column with multiple naming patterns
-            for col in ['date', 'datetime', 'Date', 'DATE']:
-                if col in daily_weather.columns:
-                    date_col = col
-                    break
+            # Column detection (memoized per schema); plot_data below shares this schema
+            daily_cols = daily_weather.columns
+            roles = classify_columns(tuple(daily_cols))
+            temp_avg_col = roles['temp_avg']
+            date_col = roles['date']
 
-            st.write(f"🌡️ Temperature columns detected:")
-            st.write(f"  - Avg: {temp_avg_col}")
-            st.write(f"📅 Date column detected: {date_col}")
+            dbg(lambda: "🌡️ Temperature columns detected:")
+            dbg(lambda: f"  - Avg: {temp_avg_col}")
+            dbg(lambda: f"📅 Date column detected: {date_col}")
 
             if date_col and (temp_avg_col):
                 # Prepare data for plotting
@@ -145,14 +250,14 @@ def render_weather_section(current_weather, daily_weather, hourly_weather):
                 # Ensure date is datetime
                 if not pd.api.types.is_datetime64_any_dtype(plot_data[date_col]):
                     try:
-                        plot_data[date_col] = pd.to_datetime(plot_data[date_col])
+                        plot_data[date_col] = parse_dates(plot_data[date_col])
                         st.success(f"✅ Successfully converted {date_col} to datetime")
                     except Exception as e:
                         st.error(f"❌ Could not convert {date_col} to datetime: {str(e)}")
                         st.write("Sample date values:", plot_data[date_col].head().tolist())
                         # Try alternative date parsing
                         try:
-                            plot_data[date_col] = pd.to_datetime(plot_data[date_col], errors='coerce')
+                            plot_data[date_col] = parse_dates(plot_data[date_col], errors='coerce')
                             if plot_data[date_col].isna().all():
                                 st.error("All dates failed to parse")
                                 return
@@ -165,14 +270,14 @@ def render_weather_section(current_weather, daily_weather, hourly_weather):
                 # Build temperature columns list with data validation
                 temp_columns_to_plot = []
 
-                if temp_avg_col and temp_avg_col in plot_data.columns:
+                if temp_avg_col and temp_avg_col in daily_cols:
                     # Check if column has non-null data
                     non_null_data = plot_data[temp_avg_col].dropna()
                     if len(non_null_data) > 0:
                         temp_columns_to_plot.append(temp_avg_col)
-                        st.write(f"  ✅ {temp_avg_col}: {len(non_null_data)} valid values")
+                        dbg(lambda: f"  ✅ {temp_avg_col}: {len(non_null_data)} valid values")
                     else:
-                        st.write(f"  ❌ {temp_avg_col}: No valid data")
+                        dbg(lambda: f"  ❌ {temp_avg_col}: No valid data")
 
                 if temp_columns_to_plot:
                     try:
@@ -183,25 +288,14 @@ def render_weather_section(current_weather, daily_weather, hourly_weather):
                             st.error("❌ No valid data rows after filtering")
                             return
 
-                        # Create the temperature forecast chart
-                        fig = px.line(
-                            plot_data,
-                            x=date_col,
-                            y=temp_columns_to_plot,
-                            title="Temperature Forecast (°C)",
-                            labels={"value": "Temperature (°C)", date_col: "Date", "variable": "Type"},
-                            color_discrete_map={
-                                temp_avg_col: "yellow" if temp_avg_col in temp_columns_to_plot else None
-                            }
-                        )
+                        # float32 is plenty for 1-decimal display and halves the figure payload
+                        plot_data[temp_columns_to_plot] = plot_data[temp_columns_to_plot].astype(np.float32)
 
-                        fig.update_layout(
-                            xaxis_title="Date",
-                            yaxis_title="Temperature (°C)",
-                            hovermode="x unified",
-                            height=400
+                        # Figure rebuilt only when the plotted columns change
+                        fig = build_temperature_forecast(
+                            plot_data[[date_col] + temp_columns_to_plot], date_col,
+                            temp_columns_to_plot, temp_avg_col
                         )
-
                         st.plotly_chart(fig, use_container_width=True)
                         st.success("✅ Temperature forecast chart created successfully!")
 
@@ -219,26 +313,25 @@ def render_weather_section(current_weather, daily_weather, hourly_weather):
                             st.write("Could not display sample data")
                 else:
                     st.error("❌ No valid temperature data found for plotting")
-                    st.write("Available columns with 'temp':", [col for col in daily_weather.columns if 'temp' in col.lower()])
+                    st.write("Available columns with 'temp':", roles['temp_all'])
 
                     # Show data sample for debugging
                     st.write("Sample of available data:")
                     st.dataframe(daily_weather.head())
 
                 # Precipitation forecast (if available and has data)
-                if 'precipitation' in daily_weather.columns:
-                    precip_data = daily_weather['precipitation'].fillna(0)
-                    if precip_data.sum() > 0:
+                if 'precipitation' in daily_cols:
+                    precip_values = daily_weather['precipitation'].to_numpy(dtype=np.float64, na_value=np.nan)
+                    if np.any(precip_values > 0):  # NaN > 0 is False, no fillna needed
                         try:
-                            fig_precip = px.bar(
-                                plot_data,
-                                x=date_col,
-                                y="precipitation",
-                                title="Precipitation Forecast (mm)",
-                                labels={"precipitation": "Precipitation (mm)", date_col: "Date"},
-                                color="precipitation_probability" if "precipitation_probability" in plot_data.columns else "precipitation"
+                            precip_cols = [col for col in ['precipitation', 'precipitation_probability']
+                                           if col in daily_cols]
+                            plot_data[precip_cols] = plot_data[precip_cols].astype(np.float32)
+
+                            color_col = "precipitation_probability" if "precipitation_probability" in daily_cols else "precipitation"
+                            fig_precip = build_precipitation_forecast(
+                                plot_data[[date_col] + precip_cols], date_col, color_col
                             )
-                            fig_precip.update_layout(height=300)
                             st.plotly_chart(fig_precip, use_container_width=True)
                         except Exception as e:
                             st.warning(f"Could not create precipitation chart: {str(e)}")
@@ -248,12 +341,12 @@ def render_weather_section(current_weather, daily_weather, hourly_weather):
                     st.info("ℹ️ Precipitation data not available in forecast")
             else:
                 st.error("❌ Missing required columns for temperature forecast")
-                st.write("**Available columns:**", list(daily_weather.columns))
+                st.write("**Available columns:**", list(daily_cols))
                 st.write("**Need:** a date column and at least one temperature column")
 
                 # Show what we found
-                date_candidates = [col for col in daily_weather.columns if any(x in col.lower() for x in ['date', 'time'])]
-                temp_candidates = [col for col in daily_weather.columns if 'temp' in col.lower()]
+                date_candidates = roles['date_candidates']
+                temp_candidates = roles['temp_all']
 
                 st.write(f"**Date candidates found:** {date_candidates}")
                 st.write(f"**Temperature candidates found:** {temp_candidates}")
@@ -1,9 +1,8 @@
 """
 API utilities for resilient data extraction
 """
-import requests
-import time
-import random
+import functools
+import json
 import logging
 from datetime import datetime
 
@@ -19,57 +18,97 @@ if parent_dir not in sys.path:
 
 from configuration.config import API_ENDPOINTS
 
-# Set up logging
-logging.basicConfig(
-    filename='api_requests.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Set up logging (handler added once, re-imports don't stack handlers)
 logger = logging.getLogger('api_utils')
+if not logger.handlers:
+    _file_handler = logging.FileHandler('api_requests.log')
+    _file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(_file_handler)
+    logger.setLevel(logging.INFO)
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_session(max_retries, backoff_factor):
+    """Return a pooled requests.Session whose adapter handles retries/backoff"""
+    # requests/urllib3 are imported on first call only
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=max(max_retries - 1, 0),  # max_retries counts attempts, Retry counts re-tries
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
 
 def get_with_retries(url, max_retries=3, backoff_factor=2, timeout=10,
                      headers=None, params=None):
     """
     Make HTTP GET requests with exponential backoff retries
     """
-    for retry in range(max_retries):
-        try:
-            response = requests.get(
-                url,
-                timeout=timeout,
-                headers=headers,
-                params=params
-            )
-
-            # Log the request
-            logger.info(f"GET {url} - Status: {response.status_code}")
-
-            # For successful responses, return immediately
-            if response.status_code < 400:
-                return response
-
-            # For server errors (5xx), retry
-            elif response.status_code >= 500:
-                logger.warning(f"Server error {response.status_code} for {url} - Attempt {retry+1}/{max_retries}")
-
-            # For client errors (4xx), retry some but not all
-            elif response.status_code == 429:  # Too many requests
-                logger.warning(f"Rate limited (429) for {url} - Attempt {retry+1}/{max_retries}")
-            elif response.status_code == 404:  # Not found
-                logger.error(f"Resource not found (404) for {url}")
-                return response  # Return the 404 response, no need to retry
-            else:
-                logger.error(f"Client error {response.status_code} for {url}")
-                return response  # Return other client errors, no need to retry
-
-        except Exception as e:
-            logger.warning(f"Request error for {url}: {str(e)} - Attempt {retry+1}/{max_retries}")
-
-        # Calculate wait time with exponential backoff and jitter
-        if retry < max_retries - 1:  # Don't sleep after the last attempt
-            wait_time = (backoff_factor ** retry) + random.uniform(0, 1)
-            logger.info(f"Retrying in {wait_time:.2f}s")
-            time.sleep(wait_time)
-
-    logger.error(f"All {max_retries} attempts failed for {url}")
-    return None
\ No newline at end of file
+    session = _get_session(max_retries, backoff_factor)
+
+    try:
+        response = session.get(
+            url,
+            timeout=timeout,
+            headers=headers,
+            params=params
+        )
+    except Exception as e:
+        logger.error(f"All {max_retries} attempts failed for {url}: {str(e)}")
+        return None
+
+    # Log the request
+    logger.info(f"GET {url} - Status: {response.status_code}")
+
+    # Retryable errors still failing after the last attempt
+    if response.status_code in RETRY_STATUS_CODES or response.status_code >= 500:
+        logger.error(f"All {max_retries} attempts failed for {url} - Status: {response.status_code}")
+        return None
+
+    if response.status_code == 404:  # Not found
+        logger.error(f"Resource not found (404) for {url}")
+    elif response.status_code >= 400:
+        logger.error(f"Client error {response.status_code} for {url}")
+
+    return response
+
+
+def loads_json(raw):
+    """Decode JSON bytes, with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def decode_json(response):
+    """Decode a requests/httpx response body, with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def encode_json(data):
+    """Serialize data to UTF-8 JSON bytes, with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
@@ -3,9 +3,11 @@ Historical data extraction script for La Défense mobility predictions
 Extracts data from 1 month ago until today for training prediction models
 """
 import pandas as pd
-import json
+import numpy as np
+import pyarrow as pa
 import requests
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import os
 import sys
 from dotenv import load_dotenv
@@ -16,13 +18,101 @@ parent_dir = os.path.dirname(current_dir)
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
-from utils.data_lake_utils import get_s3_client, save_parquet_to_data_lake, save_json_to_data_lake
+from utils.data_lake_utils import get_s3_client, save_parquet_to_data_lake, save_json_to_data_lake, \
+    save_partitioned_table_to_data_lake, read_partitioned_table_from_data_lake, \
+    read_json_from_data_lake
 from configuration.config import DATA_LAKE, LADEFENSE_COORDINATES
-from data_extraction.api_utils import get_with_retries
+from data_extraction.api_utils import get_with_retries, decode_json
 
 # Load environment variables
 load_dotenv()
 
+# Seed for the synthetic patterns (set SEED for reproducible runs)
+SEED = int(os.environ["SEED"]) if os.getenv("SEED") else None
+
+# Parquet settings: snappy for the intermediate historical files (fast re-reads),
+# zstd for the training dataset read by the ML jobs
+HISTORICAL_PARQUET_OPTIONS = {
+    "engine": "pyarrow",
+    "compression": "snappy",
+    "row_group_size": 64_000,
+    "use_dictionary": True
+}
+# Historical weather is stored as a dataset partitioned by date; the manifest lists the
+# days already fetched (complete days only) so re-runs only query the missing ones
+WEATHER_DATASET_PREFIX = "analytics/historical/weather"
+WEATHER_MANIFEST_KEY = "analytics/historical/weather_manifest.json"
+# Transport and traffic patterns use the same date partitioning (date=YYYY-MM-DD/part-0.parquet),
+# so readers filtering on a date range only download the matching days
+TRANSPORT_PATTERNS_PREFIX = "analytics/historical/transport_patterns"
+TRAFFIC_PATTERNS_PREFIX = "analytics/historical/traffic_patterns"
+
+# Historical weather file: daily rows and hourly rows share one table, absent fields are null
+WEATHER_HISTORY_SCHEMA = pa.schema([
+    ("date", pa.string()),
+    ("temperature_max", pa.float32()),
+    ("temperature_min", pa.float32()),
+    ("temperature_avg", pa.float32()),
+    ("humidity", pa.float32()),
+    ("precipitation", pa.float32()),
+    ("precipitation_prob", pa.float32()),
+    ("wind_speed", pa.float32()),
+    ("pressure", pa.float32()),
+    ("visibility", pa.float32()),
+    ("conditions", pa.string()),
+    ("extraction_time", pa.string()),
+    ("datetime", pa.string()),
+    ("hour", pa.int8()),
+    ("temperature", pa.float32()),
+    ("feels_like", pa.float32()),
+])
+# Visual Crossing fields -> historical schema columns
+WEATHER_DAILY_FIELDS = {
+    "datetime": "date",
+    "tempmax": "temperature_max",
+    "tempmin": "temperature_min",
+    "temp": "temperature_avg",
+    "humidity": "humidity",
+    "precip": "precipitation",
+    "precipprob": "precipitation_prob",
+    "windspeed": "wind_speed",
+    "pressure": "pressure",
+    "visibility": "visibility",
+    "conditions": "conditions",
+}
+WEATHER_HOURLY_FIELDS = {
+    "datetime": "time",
+    "temp": "temperature",
+    "feelslike": "feels_like",
+    "humidity": "humidity",
+    "precip": "precipitation",
+    "precipprob": "precipitation_prob",
+    "windspeed": "wind_speed",
+    "pressure": "pressure",
+    "visibility": "visibility",
+    "conditions": "conditions",
+}
+TRAINING_PARQUET_OPTIONS = {
+    "engine": "pyarrow",
+    "compression": "zstd",
+    "compression_level": 3,
+    "use_dictionary": True
+}
+
+
+# Integer columns with a small value range
+SMALL_INT_COLUMNS = {"hour": "int8", "day_of_week": "int8", "congestion_level": "int8", "is_weekend": "bool"}
+
+
+def downcast_frame(df):
+    """Downcast float64 columns to float32 and small integer columns to int8 before writing parquet"""
+    dtypes = {col: dtype for col, dtype in SMALL_INT_COLUMNS.items() if col in df.columns}
+    dtypes.update({col: "float32" for col in df.select_dtypes("float64").columns})
+    for col in ("transport_type", "line", "road_name"):
+        if col in df.columns:
+            dtypes[col] = "category"
+    return df.astype(dtypes)
+
 
 class HistoricalDataExtractor:
     """Class for extracting historical data for predictions"""
@@ -32,6 +122,28 @@ class HistoricalDataExtractor:
         self.s3_client = get_s3_client()
         self.end_date = datetime.now()
         self.start_date = self.end_date - timedelta(days=30)  # 1 month ago
+        # Single extraction timestamp shared by every record of this run
+        self.extraction_time = datetime.now().isoformat()
+        # Outputs of this run's stages, reused by create_combined_dataset instead of re-reading S3
+        self._weather_table = None
+        self._transport_df = None
+        self._traffic_df = None
+        # One generator per stage: the stages run concurrently and np.random.Generator
+        # is not thread-safe
+        transport_seed, traffic_seed = np.random.SeedSequence(SEED).spawn(2)
+        self._transport_rng = np.random.default_rng(transport_seed)
+        self._traffic_rng = np.random.default_rng(traffic_seed)
+
+    def _save_partitioned_patterns(self, prefix, df):
+        """Write a pattern frame as a dataset partitioned by date"""
+        write_options = {k: v for k, v in HISTORICAL_PARQUET_OPTIONS.items() if k != "engine"}
+        return save_partitioned_table_to_data_lake(
+            self.bucket_name,
+            prefix,
+            pa.Table.from_pandas(df, preserve_index=False),
+            ["date"],
+            **write_options
+        )
 
     def extract_historical_weather(self):
         """Extract historical weather data from Visual Crossing API"""
@@ -45,9 +157,17 @@ class HistoricalDataExtractor:
         lat, lon = LADEFENSE_COORDINATES["lat"], LADEFENSE_COORDINATES["lon"]
         location = "La Défense, Paris, France"
 
-        # Format dates for API
-        start_date_str = self.start_date.strftime("%Y-%m-%d")
-        end_date_str = self.end_date.strftime("%Y-%m-%d")
+        # Only the days missing from the manifest are requested
+        required_dates = pd.date_range(self.start_date.date(), self.end_date.date(), freq='D').strftime("%Y-%m-%d")
+        manifest = read_json_from_data_lake(self.bucket_name, WEATHER_MANIFEST_KEY) or {}
+        cached_dates = manifest.get("dates", {})
+        missing_dates = [date for date in required_dates if date not in cached_dates]
+        if not missing_dates:
+            print("Historical weather already up to date, nothing to fetch")
+            return True
+
+        start_date_str, end_date_str = missing_dates[0], missing_dates[-1]
+        print(f"Fetching weather for {len(missing_dates)} missing days ({start_date_str} to {end_date_str})")
 
         url = f"https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline/{location}/{start_date_str}/{end_date_str}"
 
@@ -62,55 +182,63 @@ class HistoricalDataExtractor:
         try:
             response = requests.get(url, params=params, timeout=30)
             if response.status_code == 200:
-                weather_data = response.json()
-
-                # Process daily data
-                daily_records = []
-                for day in weather_data.get("days", []):
-                    daily_record = {
-                        "date": day.get("datetime"),
-                        "temperature_max": day.get("tempmax"),
-                        "temperature_min": day.get("tempmin"),
-                        "temperature_avg": day.get("temp"),
-                        "humidity": day.get("humidity"),
-                        "precipitation": day.get("precip", 0),
-                        "precipitation_prob": day.get("precipprob", 0),
-                        "wind_speed": day.get("windspeed"),
-                        "pressure": day.get("pressure"),
-                        "visibility": day.get("visibility"),
-                        "conditions": day.get("conditions"),
-                        "extraction_time": datetime.now().isoformat()
-                    }
-                    daily_records.append(daily_record)
-
-                    # Process hourly data for each day
-                    for hour in day.get("hours", []):
-                        hour_record = {
-                            "datetime": f"{day.get('datetime')} {hour.get('datetime')}",
-                            "date": day.get("datetime"),
-                            "hour": int(hour.get("datetime", "00:00:00").split(":")[0]),
-                            "temperature": hour.get("temp"),
-                            "feels_like": hour.get("feelslike"),
-                            "humidity": hour.get("humidity"),
-                            "precipitation": hour.get("precip", 0),
-                            "precipitation_prob": hour.get("precipprob", 0),
-                            "wind_speed": hour.get("windspeed"),
-                            "pressure": hour.get("pressure"),
-                            "visibility": hour.get("visibility"),
-                            "conditions": hour.get("conditions"),
-                            "extraction_time": datetime.now().isoformat()
-                        }
-                        daily_records.append(hour_record)
-
-                # Save historical weather data
-                if daily_records:
-                    df = pd.DataFrame(daily_records)
-                    save_parquet_to_data_lake(
+                weather_data = decode_json(response)
+                extraction_time = self.extraction_time
+
+                days = weather_data.get("days", [])
+
+                # Flatten days/hours with json_normalize (no nested loop)
+                daily = pd.json_normalize(days).rename(columns=WEATHER_DAILY_FIELDS)
+                daily = daily.reindex(columns=list(WEATHER_DAILY_FIELDS.values()))
+
+                days_with_hours = [day for day in days if day.get("hours")]
+                if days_with_hours:
+                    hourly = pd.json_normalize(days_with_hours, record_path="hours",
+                                               meta=["datetime"], meta_prefix="day_")
+                    hourly = hourly.rename(columns=WEATHER_HOURLY_FIELDS)
+                    hourly["date"] = hourly.pop("day_datetime")
+                    hourly["hour"] = hourly["time"].str.slice(0, 2).astype("Int8")
+                    hourly["datetime"] = hourly["date"] + " " + hourly.pop("time")
+                else:
+                    hourly = pd.DataFrame()
+
+                weather_df = pd.concat([daily, hourly], ignore_index=True)
+                weather_df[["precipitation", "precipitation_prob"]] = (
+                    weather_df[["precipitation", "precipitation_prob"]].fillna(0)
+                )
+                weather_df["extraction_time"] = extraction_time
+                weather_df = weather_df.reindex(columns=WEATHER_HISTORY_SCHEMA.names)
+
+                # Save historical weather data (Arrow table written straight to parquet)
+                record_count = len(weather_df)
+                if record_count:
+                    table = pa.Table.from_pandas(weather_df, schema=WEATHER_HISTORY_SCHEMA,
+                                                 preserve_index=False)
+                    # Reused as is by create_combined_dataset only if it covers the whole period
+                    if len(missing_dates) == len(required_dates):
+                        self._weather_table = table
+                    if not save_partitioned_table_to_data_lake(
+                        self.bucket_name,
+                        WEATHER_DATASET_PREFIX,
+                        table,
+                        ["date"],
+                        compression="snappy",
+                        row_group_size=64_000,
+                        use_dictionary=True
+                    ):
+                        return False
+
+                    # Today is still in progress: it stays out of the manifest and is fetched again next run
+                    today = self.end_date.strftime("%Y-%m-%d")
+                    cached_dates.update(
+                        (date, extraction_time) for date in weather_df["date"].dropna().unique() if date < today
+                    )
+                    save_json_to_data_lake(
                         self.bucket_name,
-                        f"analytics/historical/weather_historical_{start_date_str}_{end_date_str}.parquet",
-                        df
+                        WEATHER_MANIFEST_KEY,
+                        {"dates": cached_dates, "updated_at": extraction_time}
                     )
-                    print(f"Saved {len(daily_records)} historical weather records")
+                    print(f"Saved {record_count} historical weather records")
                     return True
 
             else:
@@ -128,72 +256,66 @@ class HistoricalDataExtractor:
         # This would typically come from stored daily snapshots
         # For now, we'll create a pattern based on typical La Défense schedules
 
-        historical_patterns = []
-        current_date = self.start_date
-
-        while current_date <= self.end_date:
-            # Generate realistic transport patterns for each day
-            day_of_week = current_date.weekday()  # 0=Monday, 6=Sunday
-            is_weekend = day_of_week >= 5
-
-            for hour in range(24):
-                # Calculate typical passenger loads based on time and day
-                if is_weekend:
-                    # Weekend patterns - lower overall usage
-                    base_load = 0.3
-                    if 10 <= hour <= 14:  # Weekend shopping hours
-                        base_load = 0.6
-                    elif 19 <= hour <= 22:  # Weekend evening
-                        base_load = 0.5
-                else:
-                    # Weekday patterns
-                    base_load = 0.4
-                    if 7 <= hour <= 9:  # Morning rush
-                        base_load = 0.9
-                    elif 12 <= hour <= 14:  # Lunch
-                        base_load = 0.7
-                    elif 17 <= hour <= 19:  # Evening rush
-                        base_load = 0.95
-
-                # Transport lines with different patterns
-                transport_lines = [
-                    {"type": "metro", "line": "1", "base_reliability": 0.95},
-                    {"type": "rers", "line": "A", "base_reliability": 0.88},
-                    {"type": "rers", "line": "E", "base_reliability": 0.92},
-                    {"type": "transilien", "line": "L", "base_reliability": 0.85},
-                ]
-
-                for transport in transport_lines:
-                    # Add some randomness to simulate real variations
-                    import random
-                    load_variation = random.uniform(-0.1, 0.1)
-                    reliability_variation = random.uniform(-0.05, 0.05)
-
-                    pattern = {
-                        "date": current_date.strftime("%Y-%m-%d"),
-                        "hour": hour,
-                        "day_of_week": day_of_week,
-                        "is_weekend": is_weekend,
-                        "transport_type": transport["type"],
-                        "line": transport["line"],
-                        "passenger_load": min(1.0, max(0.0, base_load + load_variation)),
-                        "reliability": min(1.0, max(0.6, transport["base_reliability"] + reliability_variation)),
-                        "delays_minutes": max(0, random.normalvariate(2, 3)) if base_load > 0.8 else max(0, random.normalvariate(0.5, 1)),
-                        "extraction_time": datetime.now().isoformat()
-                    }
-                    historical_patterns.append(pattern)
-
-            current_date += timedelta(days=1)
+        # Transport lines with different patterns
+        transport_lines = [
+            {"type": "metro", "line": "1", "base_reliability": 0.95},
+            {"type": "rers", "line": "A", "base_reliability": 0.88},
+            {"type": "rers", "line": "E", "base_reliability": 0.92},
+            {"type": "transilien", "line": "L", "base_reliability": 0.85},
+        ]
+        # Calendar computed once per day, then broadcast to the rows
+        days = pd.date_range(self.start_date.date(), self.end_date.date(), freq='D')
+        n_days = len(days)
+        n_lines = len(transport_lines)
+        n_rows = n_days * 24 * n_lines
+
+        # One row per (day, hour, line), same order as the former nested loops
+        day_idx = np.repeat(np.arange(n_days), 24 * n_lines)
+        hour = np.tile(np.repeat(np.arange(24), n_lines), n_days)
+        line_idx = np.tile(np.arange(n_lines), n_days * 24)
+
+        dates = days.strftime("%Y-%m-%d").to_numpy()
+        day_of_week = days.dayofweek.to_numpy(dtype=np.int8)[day_idx]  # 0=Monday, 6=Sunday
+        is_weekend = day_of_week >= 5
+
+        # Calculate typical passenger loads based on time and day
+        weekend_load = np.select(
+            [(hour >= 10) & (hour <= 14), (hour >= 19) & (hour <= 22)],  # Weekend shopping hours / evening
+            [0.6, 0.5],
+            default=0.3
+        )
+        weekday_load = np.select(
+            [(hour >= 7) & (hour <= 9), (hour >= 12) & (hour <= 14), (hour >= 17) & (hour <= 19)],  # Rush / lunch / rush
+            [0.9, 0.7, 0.95],
+            default=0.4
+        )
+        base_load = np.where(is_weekend, weekend_load, weekday_load)
+
+        # Add some randomness to simulate real variations
+        load_variation = self._transport_rng.uniform(-0.1, 0.1, n_rows)
+        reliability_variation = self._transport_rng.uniform(-0.05, 0.05, n_rows)
+        base_reliability = np.array([transport["base_reliability"] for transport in transport_lines])
+        delays = np.where(base_load > 0.8, self._transport_rng.normal(2, 3, n_rows), self._transport_rng.normal(0.5, 1, n_rows))
+
+        # Typed columns: small ints, float32 measures, dictionary-encoded line identifiers
+        df = pd.DataFrame({
+            "date": dates[day_idx],
+            "hour": hour.astype(np.int8),
+            "day_of_week": day_of_week.astype(np.int8),
+            "is_weekend": is_weekend,
+            "transport_type": pd.Categorical(np.array([transport["type"] for transport in transport_lines])[line_idx]),
+            "line": pd.Categorical(np.array([transport["line"] for transport in transport_lines])[line_idx]),
+            "passenger_load": np.clip(base_load + load_variation, 0.0, 1.0).astype(np.float32),
+            "reliability": np.clip(base_reliability[line_idx] + reliability_variation, 0.6, 1.0).astype(np.float32),
+            "delays_minutes": np.clip(delays, 0, None).astype(np.float32),
+            "extraction_time": self.extraction_time
+        })
 
         # Save historical patterns
-        if historical_patterns:
-            df = pd.DataFrame(historical_patterns)
-            save_parquet_to_data_lake(
-                self.bucket_name,
-                f"analytics/historical/transport_patterns_{self.start_date.strftime('%Y%m%d')}_{self.end_date.strftime('%Y%m%d')}.parquet",
-                df
-            )
-            print(f"Saved {len(historical_patterns)} historical transport pattern records")
+        self._transport_df = df
+        if not df.empty:
+            self._save_partitioned_patterns(TRANSPORT_PATTERNS_PREFIX, df)
+            print(f"Saved {len(df)} historical transport pattern records")
             return True
 
         return False
@@ -211,68 +333,55 @@ class HistoricalDataExtractor:
             {"name": "Rond-Point de La Défense", "base_congestion": 3},
         ]
 
-        traffic_patterns = []
-        current_date = self.start_date
-
-        while current_date <= self.end_date:
-            day_of_week = current_date.weekday()
-            is_weekend = day_of_week >= 5
-
-            for hour in range(24):
-                for road in road_segments:
-                    # Calculate congestion based on time patterns
-                    base_congestion = road["base_congestion"]
-
-                    if is_weekend:
-                        # Weekend traffic patterns
-                        if 10 <= hour <= 14:  # Shopping hours
-                            congestion_multiplier = 1.3
-                        elif 15 <= hour <= 18:  # Return traffic
-                            congestion_multiplier = 1.1
-                        else:
-                            congestion_multiplier = 0.7
-                    else:
-                        # Weekday traffic patterns
-                        if 7 <= hour <= 9:  # Morning rush
-                            congestion_multiplier = 1.8
-                        elif 12 <= hour <= 14:  # Lunch traffic
-                            congestion_multiplier = 1.2
-                        elif 17 <= hour <= 19:  # Evening rush
-                            congestion_multiplier = 1.9
-                        elif 6 <= hour <= 22:  # Daytime
-                            congestion_multiplier = 1.0
-                        else:  # Night
-                            congestion_multiplier = 0.3
-
-                    # Add weather influence (simplified)
-                    import random
-                    weather_impact = random.choice([1.0, 1.0, 1.0, 1.2, 1.5])  # Most days normal, some with weather impact
-
-                    final_congestion = min(5, max(0, int(base_congestion * congestion_multiplier * weather_impact)))
-
-                    pattern = {
-                        "date": current_date.strftime("%Y-%m-%d"),
-                        "hour": hour,
-                        "day_of_week": day_of_week,
-                        "is_weekend": is_weekend,
-                        "road_name": road["name"],
-                        "congestion_level": final_congestion,
-                        "travel_time_multiplier": 1.0 + (final_congestion * 0.2),
-                        "extraction_time": datetime.now().isoformat()
-                    }
-                    traffic_patterns.append(pattern)
-
-            current_date += timedelta(days=1)
+        # One row per (day, hour, road), same order as the former nested loops
+        days = pd.date_range(self.start_date.date(), self.end_date.date(), freq='D')
+        road_names = [road["name"] for road in road_segments]
+        grid_index = pd.MultiIndex.from_product([days, range(24), road_names], names=['date', 'hour', 'road_name'])
+        grid = grid_index.to_frame(index=False).merge(
+            pd.DataFrame(road_segments).rename(columns={'name': 'road_name'}), on='road_name', how='left'
+        )
+        n_rows = len(grid)
+
+        hour = grid['hour'].to_numpy()
+        day_of_week = grid['date'].dt.dayofweek.to_numpy(dtype=np.int8)
+        is_weekend = day_of_week >= 5
+
+        # Calculate congestion based on time patterns
+        weekend_multiplier = np.select(
+            [(hour >= 10) & (hour <= 14), (hour >= 15) & (hour <= 18)],  # Shopping hours / return traffic
+            [1.3, 1.1],
+            default=0.7
+        )
+        weekday_multiplier = np.select(
+            [(hour >= 7) & (hour <= 9), (hour >= 12) & (hour <= 14),  # Morning rush / lunch traffic
+             (hour >= 17) & (hour <= 19), (hour >= 6) & (hour <= 22)],  # Evening rush / daytime
+            [1.8, 1.2, 1.9, 1.0],
+            default=0.3  # Night
+        )
+        congestion_multiplier = np.where(is_weekend, weekend_multiplier, weekday_multiplier)
+
+        # Add weather influence (simplified): most days normal, some with weather impact
+        weather_impact = self._traffic_rng.choice([1.0, 1.0, 1.0, 1.2, 1.5], size=n_rows)
+
+        final_congestion = (grid['base_congestion'].to_numpy() * congestion_multiplier * weather_impact).astype(np.int64).clip(0, 5)
+
+        df = pd.DataFrame({
+            # Dates formatted once per day, then broadcast through the grid codes
+            "date": days.strftime("%Y-%m-%d").to_numpy()[grid_index.codes[0]],
+            "hour": hour.astype(np.int8),
+            "day_of_week": day_of_week,
+            "is_weekend": is_weekend,
+            "road_name": grid["road_name"].astype(pd.CategoricalDtype(road_names)).array,
+            "congestion_level": final_congestion.astype(np.int8),
+            "travel_time_multiplier": (1.0 + (final_congestion * 0.2)).astype(np.float32),
+            "extraction_time": self.extraction_time
+        })
 
         # Save traffic patterns
-        if traffic_patterns:
-            df = pd.DataFrame(traffic_patterns)
-            save_parquet_to_data_lake(
-                self.bucket_name,
-                f"analytics/historical/traffic_patterns_{self.start_date.strftime('%Y%m%d')}_{self.end_date.strftime('%Y%m%d')}.parquet",
-                df
-            )
-            print(f"Saved {len(traffic_patterns)} historical traffic pattern records")
+        self._traffic_df = df
+        if not df.empty:
+            self._save_partitioned_patterns(TRAFFIC_PATTERNS_PREFIX, df)
+            print(f"Saved {len(df)} historical traffic pattern records")
             return True
 
         return False
@@ -282,111 +391,100 @@ class HistoricalDataExtractor:
         print("Creating combined dataset for predictions...")
 
         try:
-            # Load historical data
-            start_str = self.start_date.strftime('%Y%m%d')
-            end_str = self.end_date.strftime('%Y%m%d')
-
-            # Read the data we just created
-            from utils.data_lake_utils import read_parquet_from_data_lake
-
-            transport_df = read_parquet_from_data_lake(
-                self.bucket_name,
-                f"analytics/historical/transport_patterns_{start_str}_{end_str}.parquet"
-            )
+            # Load historical data (partition filter on the extraction period)
+            date_filters = [('date', '>=', self.start_date.strftime('%Y-%m-%d')),
+                            ('date', '<=', self.end_date.strftime('%Y-%m-%d'))]
+
+            # Only the columns used below are kept (and decoded, when read back from parquet)
+            transport_columns = ['date', 'hour', 'day_of_week', 'is_weekend', 'transport_type', 'line',
+                                 'passenger_load', 'reliability', 'delays_minutes']
+            traffic_columns = ['date', 'hour', 'congestion_level', 'travel_time_multiplier']
+            weather_columns = ['date', 'temperature_avg', 'humidity', 'precipitation', 'wind_speed', 'pressure', 'visibility']
+
+            # Use the frames produced by this run, read from the data lake only when run stand-alone
+            def read_dataset(prefix, columns):
+                table = read_partitioned_table_from_data_lake(self.bucket_name, prefix,
+                                                              filters=date_filters, columns=columns)
+                return table.to_pandas() if table is not None else pd.DataFrame()
+
+            if self._transport_df is not None:
+                transport_df = self._transport_df[transport_columns]
+            else:
+                transport_df = read_dataset(TRANSPORT_PATTERNS_PREFIX, transport_columns)
 
-            traffic_df = read_parquet_from_data_lake(
-                self.bucket_name,
-                f"analytics/historical/traffic_patterns_{start_str}_{end_str}.parquet"
-            )
+            if self._traffic_df is not None:
+                traffic_df = self._traffic_df[traffic_columns]
+            else:
+                traffic_df = read_dataset(TRAFFIC_PATTERNS_PREFIX, traffic_columns)
 
-            weather_df = read_parquet_from_data_lake(
-                self.bucket_name,
-                f"analytics/historical/weather_historical_{self.start_date.strftime('%Y-%m-%d')}_{self.end_date.strftime('%Y-%m-%d')}.parquet"
-            )
+            if self._weather_table is not None:
+                weather_df = self._weather_table.select(weather_columns).to_pandas()
+            else:
+                weather_df = read_dataset(WEATHER_DATASET_PREFIX, weather_columns)
 
             # Process weather data to daily aggregates
             if not weather_df.empty:
                 # Get daily weather summaries
-                daily_weather = weather_df.groupby('date').agg({
-                    'temperature_avg': 'mean',
-                    'humidity': 'mean',
-                    'precipitation': 'sum',
-                    'wind_speed': 'mean',
-                    'pressure': 'mean',
-                    'visibility': 'mean'
-                }).reset_index()
-                daily_weather.columns = ['date', 'avg_temp', 'avg_humidity', 'total_precip', 'avg_wind', 'avg_pressure', 'avg_visibility']
+                daily_weather = weather_df.groupby('date', sort=False, observed=True, as_index=False).agg(
+                    avg_temp=('temperature_avg', 'mean'),
+                    avg_humidity=('humidity', 'mean'),
+                    total_precip=('precipitation', 'sum'),
+                    avg_wind=('wind_speed', 'mean'),
+                    avg_pressure=('pressure', 'mean'),
+                    avg_visibility=('visibility', 'mean')
+                )
             else:
                 daily_weather = pd.DataFrame()
 
             # Combine datasets
-            combined_data = []
-
             if not transport_df.empty and not traffic_df.empty:
-                # Merge transport and traffic data by date and hour
-                for _, transport_row in transport_df.iterrows():
-                    date = transport_row['date']
-                    hour = transport_row['hour']
-
-                    # Find matching traffic data
-                    traffic_match = traffic_df[
-                        (traffic_df['date'] == date) &
-                        (traffic_df['hour'] == hour)
-                    ]
-
-                    # Find matching weather data
-                    weather_match = daily_weather[daily_weather['date'] == date] if not daily_weather.empty else pd.DataFrame()
-
-                    if not traffic_match.empty:
-                        avg_congestion = traffic_match['congestion_level'].mean()
-                        avg_travel_multiplier = traffic_match['travel_time_multiplier'].mean()
-
-                        combined_record = {
-                            "date": date,
-                            "hour": hour,
-                            "day_of_week": transport_row['day_of_week'],
-                            "is_weekend": transport_row['is_weekend'],
-                            "transport_type": transport_row['transport_type'],
-                            "line": transport_row['line'],
-                            "passenger_load": transport_row['passenger_load'],
-                            "transport_reliability": transport_row['reliability'],
-                            "transport_delays": transport_row['delays_minutes'],
-                            "avg_road_congestion": avg_congestion,
-                            "avg_travel_multiplier": avg_travel_multiplier,
-                        }
-
-                        # Add weather data if available
-                        if not weather_match.empty:
-                            weather_row = weather_match.iloc[0]
-                            combined_record.update({
-                                "temperature": weather_row['avg_temp'],
-                                "humidity": weather_row['avg_humidity'],
-                                "precipitation": weather_row['total_precip'],
-                                "wind_speed": weather_row['avg_wind'],
-                                "pressure": weather_row['avg_pressure'],
-                                "visibility": weather_row['avg_visibility']
-                            })
-                        else:
-                            # Default weather values
-                            combined_record.update({
-                                "temperature": 15.0,
-                                "humidity": 70.0,
-                                "precipitation": 0.0,
-                                "wind_speed": 10.0,
-                                "pressure": 1013.0,
-                                "visibility": 10.0
-                            })
-
-                        combined_data.append(combined_record)
-
-            if combined_data:
-                combined_df = pd.DataFrame(combined_data)
+                # Average road conditions per date and hour, then join transport rows on them
+                traffic_agg = traffic_df.groupby(['date', 'hour'], sort=False, as_index=False).agg(
+                    avg_road_congestion=('congestion_level', 'mean'),
+                    avg_travel_multiplier=('travel_time_multiplier', 'mean')
+                )
+                combined_df = transport_df.merge(traffic_agg, on=['date', 'hour'], how='inner')
+
+                # Add weather data if available, default weather values otherwise
+                weather_defaults = {
+                    "temperature": 15.0,
+                    "humidity": 70.0,
+                    "precipitation": 0.0,
+                    "wind_speed": 10.0,
+                    "pressure": 1013.0,
+                    "visibility": 10.0
+                }
+                if not daily_weather.empty:
+                    combined_df = combined_df.merge(
+                        daily_weather.rename(columns={
+                            'avg_temp': 'temperature',
+                            'avg_humidity': 'humidity',
+                            'total_precip': 'precipitation',
+                            'avg_wind': 'wind_speed',
+                            'avg_pressure': 'pressure',
+                            'avg_visibility': 'visibility'
+                        }),
+                        on='date',
+                        how='left'
+                    ).fillna(weather_defaults)
+                else:
+                    combined_df = combined_df.assign(**weather_defaults)
+
+                combined_df = downcast_frame(combined_df.rename(columns={
+                    'reliability': 'transport_reliability',
+                    'delays_minutes': 'transport_delays'
+                }))
+            else:
+                combined_df = pd.DataFrame()
+
+            if not combined_df.empty:
                 save_parquet_to_data_lake(
                     self.bucket_name,
                     "analytics/training/mobility_training_dataset.parquet",
-                    combined_df
+                    combined_df,
+                    **TRAINING_PARQUET_OPTIONS
                 )
-                print(f"Created combined training dataset with {len(combined_data)} records")
+                print(f"Created combined training dataset with {len(combined_df)} records")
                 return True
 
         except Exception as e:
@@ -397,19 +495,15 @@ class HistoricalDataExtractor:
         """Run complete historical data extraction"""
         print(f"Starting historical data extraction from {self.start_date.strftime('%Y-%m-%d')} to {self.end_date.strftime('%Y-%m-%d')}")
 
-        success_count = 0
-
-        # Extract weather data
-        if self.extract_historical_weather():
-            success_count += 1
-
-        # Extract transport patterns
-        if self.extract_historical_transport_patterns():
-            success_count += 1
-
-        # Extract traffic patterns
-        if self.extract_historical_traffic_patterns():
-            success_count += 1
+        # Weather, transport and traffic write disjoint keys: run them concurrently
+        # (the shared boto3 client is thread-safe)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            stages = [
+                executor.submit(self.extract_historical_weather),
+                executor.submit(self.extract_historical_transport_patterns),
+                executor.submit(self.extract_historical_traffic_patterns),
+            ]
+            success_count = sum(1 for stage in stages if stage.result())
 
         # Create combined dataset
         if self.create_combined_dataset():
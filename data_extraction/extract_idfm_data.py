@@ -2,9 +2,15 @@
 IDFM API data extraction script for La Défense
 Extracts real-time schedule information and station data
 """
+import asyncio
+import hashlib
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import threading
+import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import os
 import sys
 
@@ -15,12 +21,142 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 from dotenv import load_dotenv
-from utils.data_lake_utils import get_s3_client, save_json_to_data_lake
+from utils.data_lake_utils import get_s3_client, save_json_to_data_lake, LOCAL_CACHE_DIR
 from configuration.config import DATA_LAKE, LADEFENSE_COORDINATES
+from data_extraction.api_utils import RETRY_STATUS_CODES, decode_json, loads_json
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 - needed by httpx for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 # Load environment variables
 load_dotenv()
 
+# Max concurrent stop-monitoring requests (API limit)
+MAX_CONCURRENT_STOP_REQUESTS = 32
+# Threads for the fallback without httpx
+DEPARTURE_THREADS = 16
+# API quota: stop-monitoring requests are spaced out and retried on 429/5xx
+MAX_STOP_REQUESTS_PER_SECOND = 10
+STOP_REQUEST_RETRIES = 3
+
+# Stops around La Défense rarely change: the stop-points response is kept on disk for 1h
+STOPS_CACHE_TTL = 3600
+# Real-time departures are refreshed server-side every ~30s: no point asking again sooner
+DEPARTURES_CACHE_TTL = 30
+
+
+def _ttl_cache_path(*parts):
+    """Local cache file for a request, keyed on its identifying parts"""
+    name = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    return os.path.join(LOCAL_CACHE_DIR, f"idfm_{name}.json")
+
+
+def _read_ttl_cache(cache_path, ttl):
+    """Decoded content of a cache file younger than ttl seconds, None otherwise"""
+    try:
+        if time.time() - os.path.getmtime(cache_path) < ttl:
+            with open(cache_path, 'rb') as f:
+                content = f.read()
+            return loads_json(content)
+    except (OSError, ValueError):
+        pass  # No valid local copy
+    return None
+
+
+def _write_ttl_cache(cache_path, content):
+    """Store a raw JSON body in the local cache (atomic replace)"""
+    try:
+        os.makedirs(LOCAL_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Could not write local cache {cache_path}: {str(e)}")
+
+
+def _get_json_with_ttl_cache(session, url, params, ttl):
+    """GET a JSON endpoint, reusing a local copy younger than ttl seconds
+
+    Returns (status_code, data); the cache is keyed on the URL and the query parameters.
+    """
+    cache_path = _ttl_cache_path(url, sorted(params.items()))
+    data = _read_ttl_cache(cache_path, ttl)
+    if data is not None:
+        return 200, data
+
+    response = session.get(url, params=params, timeout=30)
+    if response.status_code != 200:
+        return response.status_code, None
+
+    data = decode_json(response)
+    _write_ttl_cache(cache_path, response.content)
+    return 200, data
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(value):
+    """Parse an IDFM ISO timestamp, memoized since the same times repeat across visits"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+async def fetch_departures_async(stops, departures_url, headers):
+    """Fetch stop-monitoring responses for all stops on one event loop, returns [(stop, response)] in stop order
+
+    Requests are spaced to stay under MAX_STOP_REQUESTS_PER_SECOND; 429/5xx answers and
+    network errors are retried with exponential backoff (Retry-After honoured).
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_STOP_REQUESTS)
+    limits = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+    loop = asyncio.get_running_loop()
+    rate_lock = asyncio.Lock()
+    interval = 1.0 / MAX_STOP_REQUESTS_PER_SECOND
+    next_slot = loop.time()
+
+    async def wait_for_slot():
+        nonlocal next_slot
+        async with rate_lock:
+            now = loop.time()
+            delay = next_slot - now
+            next_slot = max(now, next_slot) + interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async with httpx.AsyncClient(headers=headers, http2=HTTP2_AVAILABLE, timeout=30, limits=limits) as client:
+        async def fetch(stop):
+            params = {
+                "MonitoringRef": stop["id"],
+                "MaximumStopVisits": 10  # Get up to 10 departures per stop
+            }
+            async with semaphore:
+                for attempt in range(STOP_REQUEST_RETRIES):
+                    await wait_for_slot()
+                    backoff = 2 ** attempt
+                    try:
+                        response = await client.get(departures_url, params=params)
+                    except httpx.TransportError:
+                        if attempt == STOP_REQUEST_RETRIES - 1:
+                            raise
+                    else:
+                        if response.status_code not in RETRY_STATUS_CODES or attempt == STOP_REQUEST_RETRIES - 1:
+                            return stop, response
+                        retry_after = response.headers.get("Retry-After", "")
+                        if retry_after.isdigit():
+                            backoff = max(backoff, int(retry_after))
+                    await asyncio.sleep(backoff)
+
+        return await asyncio.gather(*(fetch(stop) for stop in stops))
+
+
 def extract_idfm_data():
     """Extract real-time schedules and station data for La Défense using IDFM API"""
     # Get API key from environment variables
@@ -57,6 +193,12 @@ def extract_idfm_data():
         "traffic_status": []
     }
 
+    # One session for every call: pooled keep-alive connections, TLS handshake done once.
+    # The pool is sized for the departure threads (default is 10, extra sockets would be dropped)
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=DEPARTURE_THREADS))
+    session.headers.update(headers)
+
     try:
         # Step 1: Get traffic status information
         traffic_params = {
@@ -64,14 +206,14 @@ def extract_idfm_data():
             "StopPointRef": ""  # Empty for all stops
         }
 
-        traffic_response = requests.get(
+        traffic_response = session.get(
             base_url,
-            headers=headers,
-            params=traffic_params
+            params=traffic_params,
+            timeout=30
         )
 
         if traffic_response.status_code == 200:
-            traffic_data = traffic_response.json()
+            traffic_data = decode_json(traffic_response)
 
             # Process traffic data
             if "ServiceDelivery" in traffic_data and "GeneralMessageDelivery" in traffic_data["ServiceDelivery"]:
@@ -117,14 +259,9 @@ def extract_idfm_data():
             "BoundingBoxStructure.LowerRight.Latitude": lat - 0.01
         }
 
-        stops_response = requests.get(
-            stops_url,
-            headers=headers,
-            params=stop_params
-        )
+        stops_status, stops_data = _get_json_with_ttl_cache(session, stops_url, stop_params, STOPS_CACHE_TTL)
 
-        if stops_response.status_code == 200:
-            stops_data = stops_response.json()
+        if stops_status == 200:
 
             # Process stops data
             if "StopPoints" in stops_data:
@@ -145,29 +282,52 @@ def extract_idfm_data():
 
             print(f"Retrieved {len(idfm_data['stops'])} stops in La Défense area")
         else:
-            print(f"Error retrieving stops: {stops_response.status_code}")
+            print(f"Error retrieving stops: {stops_status}")
 
         # Step 3: Get real-time departures for stops in La Défense
         # Using stop-monitoring endpoint for each stop
         departures_url = "https://prim.iledefrance-mobilites.fr/marketplace/stop-monitoring"
 
-        for stop in idfm_data["stops"]:
-            stop_id = stop["id"]
-
+        def fetch_departures(stop):
             departure_params = {
-                "MonitoringRef": stop_id,
+                "MonitoringRef": stop["id"],
                 "MaximumStopVisits": 10  # Get up to 10 departures per stop
             }
+            return stop, session.get(departures_url, params=departure_params, timeout=30)
 
-            departures_response = requests.get(
-                departures_url,
-                headers=headers,
-                params=departure_params
+        # Stops fetched less than DEPARTURES_CACHE_TTL seconds ago (previous run) are read from disk
+        departures_by_stop = {}
+        for stop in idfm_data["stops"]:
+            cached = _read_ttl_cache(_ttl_cache_path(departures_url, stop["id"]), DEPARTURES_CACHE_TTL)
+            if cached is not None:
+                departures_by_stop[stop["id"]] = (200, cached)
+        stops_to_fetch = [stop for stop in idfm_data["stops"] if stop["id"] not in departures_by_stop]
+        if departures_by_stop:
+            print(f"Reusing cached departures for {len(departures_by_stop)} stops")
+
+        # Requests are sent concurrently (async when httpx is installed), responses processed in stop order
+        if not stops_to_fetch:
+            departure_responses = []
+        elif HTTPX_AVAILABLE:
+            departure_responses = asyncio.run(
+                fetch_departures_async(stops_to_fetch, departures_url, headers)
             )
+        else:
+            with ThreadPoolExecutor(max_workers=DEPARTURE_THREADS) as executor:
+                departure_responses = list(executor.map(fetch_departures, stops_to_fetch))
 
+        for stop, departures_response in departure_responses:
             if departures_response.status_code == 200:
-                departures_data = departures_response.json()
+                _write_ttl_cache(_ttl_cache_path(departures_url, stop["id"]), departures_response.content)
+                departures_by_stop[stop["id"]] = (200, decode_json(departures_response))
+            else:
+                departures_by_stop[stop["id"]] = (departures_response.status_code, None)
+
+        for stop in idfm_data["stops"]:
+            stop_id = stop["id"]
+            departures_status, departures_data = departures_by_stop[stop_id]
 
+            if departures_status == 200:
                 # Process departures data
                 if "ServiceDelivery" in departures_data and "StopMonitoringDelivery" in departures_data["ServiceDelivery"]:
                     visits = departures_data["ServiceDelivery"]["StopMonitoringDelivery"].get("MonitoredStopVisit", [])
@@ -200,16 +360,14 @@ def extract_idfm_data():
 
                                 # Calculate delay in minutes if both times are available
                                 if expected_time and aimed_time:
-                                    expected_dt = datetime.fromisoformat(expected_time.replace('Z', '+00:00'))
-                                    aimed_dt = datetime.fromisoformat(aimed_time.replace('Z', '+00:00'))
-                                    delay_seconds = (expected_dt - aimed_dt).total_seconds()
+                                    delay_seconds = (_parse_iso(expected_time) - _parse_iso(aimed_time)).total_seconds()
                                     departure_info["delay_minutes"] = int(delay_seconds / 60)
 
                             idfm_data["departures"].append(departure_info)
 
                 print(f"Retrieved {len(idfm_data['departures'])} departures for stop {stop['name']}")
             else:
-                print(f"Error retrieving departures for stop {stop['name']}: {departures_response.status_code}")
+                print(f"Error retrieving departures for stop {stop['name']}: {departures_status}")
 
         # Save to data lake
         s3_key = f"landing/transport/idfm_ladefense_{timestamp}.json"
@@ -225,6 +383,8 @@ def extract_idfm_data():
     except Exception as e:
         print(f"Error extracting IDFM data: {str(e)}")
         return False
+    finally:
+        session.close()
 
 
 if __name__ == "__main__":
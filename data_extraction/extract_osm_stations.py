@@ -2,23 +2,37 @@
 Enhanced OpenStreetMap station data extraction for La Défense
 """
 import requests
-import json
 from datetime import datetime
-import boto3
-from botocore.client import Config
 from configuration import config
-
-
-def get_s3_client():
-    """Create and return an S3 client connected to MinIO"""
-    return boto3.client(
-        's3',
-        endpoint_url=config.DATA_LAKE["endpoint_url"],
-        aws_access_key_id=config.DATA_LAKE["access_key"],
-        aws_secret_access_key=config.DATA_LAKE["secret_key"],
-        config=Config(signature_version='s3v4'),
-        region_name='us-east-1'
-    )
+from utils.data_lake_utils import get_s3_client, upload_bytes_to_data_lake
+from api_utils import decode_json, encode_json
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# (tag key, tag value) -> (rank, element type); the rank keeps the historical precedence
+# between tags when an element matches several rules
+ELEMENT_CLASSIFIER = {
+    ("railway", "station"): (0, "station"),
+    ("railway", "subway_entrance"): (0, "station"),
+    ("railway", "tram_stop"): (0, "station"),
+    ("public_transport", "station"): (1, "station"),
+    ("highway", "bus_stop"): (2, "station"),
+    ("railway", "station_entrance"): (3, "entrance"),
+    ("railway", "platform"): (5, "platform"),
+    ("public_transport", "platform"): (6, "platform"),
+}
+# Any "entrance" tag, whatever its value
+ENTRANCE_KEY_RULE = (4, "entrance")
+
+# Only amenities this close to a station are fetched (the whole bbox is mostly unrelated POIs)
+AMENITY_RADIUS_M = 200
+
+# Overpass can take a while on the full query; bounded so a stuck server does not hang the task
+OVERPASS_TIMEOUT = 120
 
 
 def extract_osm_station_data():
@@ -48,84 +62,84 @@ def extract_osm_station_data():
     # 1. All public transport stations (metro, train, bus, tram)
     # 2. Station entrances and exits
     # 3. Platforms
-    # 4. Amenities within stations (shops, info points, etc.)
+    # 4. Amenities within or next to stations (shops, info points, etc.)
     # 5. Accessibility information
+    bb = f"{bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']}"  # Overpass order: S,W,N,E
     overpass_query = f"""
     [out:json];
     (
       // Get all stations
-      node["public_transport"="station"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
-      way["public_transport"="station"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
-      relation["public_transport"="station"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
+      node["public_transport"="station"]({bb});
+      way["public_transport"="station"]({bb});
+      relation["public_transport"="station"]({bb});
 
       // Get railway stations
-      node["railway"="station"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
-      way["railway"="station"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
-      relation["railway"="station"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
+      node["railway"="station"]({bb});
+      way["railway"="station"]({bb});
+      relation["railway"="station"]({bb});
 
       // Get subway stations (metro)
-      node["railway"="subway_entrance"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
-      node["station"="subway"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
+      node["railway"="subway_entrance"]({bb});
+      node["station"="subway"]({bb});
 
       // Get tram stops
-      node["railway"="tram_stop"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
+      node["railway"="tram_stop"]({bb});
 
       // Get bus stations/stops
-      node["highway"="bus_stop"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
-      node["public_transport"="stop_position"]["bus"="yes"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
-    );
-    out body;
+      node["highway"="bus_stop"]({bb});
+      node["public_transport"="stop_position"]["bus"="yes"]({bb});
+    )->.stations;
+    .stations out body;
 
     // Get station entrances
     (
-      node["railway"="subway_entrance"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
-      node["railway"="station_entrance"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
-      node["entrance"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
+      node["railway"="subway_entrance"]({bb});
+      node["railway"="station_entrance"]({bb});
+      node["entrance"]({bb});
     );
     out body;
 
     // Get platforms
     (
-      node["railway"="platform"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
-      way["railway"="platform"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
-      node["public_transport"="platform"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
-      way["public_transport"="platform"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
+      node["railway"="platform"]({bb});
+      way["railway"="platform"]({bb});
+      node["public_transport"="platform"]({bb});
+      way["public_transport"="platform"]({bb});
     );
     out body;
 
-    // Get amenities within or near stations
+    // Get amenities near stations only (200 m around the station set, still inside the bbox)
     (
-      node["amenity"]({bbox['min_lat']},{bbox['min_lon']},{bbox['max_lat']},{bbox['max_lon']});
+      node["amenity"](around.stations:{AMENITY_RADIUS_M})({bb});
     );
     out body;
     """
 
     try:
         # Execute the Overpass query
-        response = requests.post(overpass_url, data={"data": overpass_query})
+        # Streamed response: elements are parsed as they arrive instead of loading the whole payload
+        response = requests.post(overpass_url, data={"data": overpass_query},
+                                 headers={"Accept-Encoding": "gzip"}, stream=True,
+                                 timeout=OVERPASS_TIMEOUT)
 
         if response.status_code == 200:
-            data = response.json()
+            if IJSON_AVAILABLE:
+                response.raw.decode_content = True  # gzip decoded by urllib3 while streaming
+                elements = ijson.items(response.raw, "elements.item", use_float=True)
+            else:
+                elements = decode_json(response).get("elements", [])
 
             # Process stations
-            for element in data.get("elements", []):
+            for element in elements:
                 tags = element.get("tags", {})
 
-                # Determine element type
-                if "railway" in tags and tags["railway"] in ["station", "subway_entrance", "tram_stop"]:
-                    element_type = "station"
-                elif "public_transport" in tags and tags["public_transport"] == "station":
-                    element_type = "station"
-                elif "highway" in tags and tags["highway"] == "bus_stop":
-                    element_type = "station"
-                elif "railway" in tags and tags["railway"] in ["subway_entrance", "station_entrance"]:
-                    element_type = "entrance"
-                elif "entrance" in tags:
-                    element_type = "entrance"
-                elif "railway" in tags and tags["railway"] == "platform":
-                    element_type = "platform"
-                elif "public_transport" in tags and tags["public_transport"] == "platform":
-                    element_type = "platform"
+                # Determine element type: one hashed probe per tag, lowest rank wins
+                # (same precedence as the former if/elif cascade)
+                matches = [ELEMENT_CLASSIFIER[tag] for tag in tags.items() if tag in ELEMENT_CLASSIFIER]
+                if "entrance" in tags:
+                    matches.append(ENTRANCE_KEY_RULE)
+                if matches:
+                    element_type = min(matches)[1]
                 elif "amenity" in tags:
                     element_type = "amenity"
                 else:
@@ -196,17 +210,14 @@ def extract_osm_station_data():
 
             # Save to data lake
             s3_key = f"landing/stations/osm_enhanced_{timestamp}.json"
-            s3.put_object(
-                Bucket=bucket_name,
-                Key=s3_key,
-                Body=json.dumps(station_data)
-            )
+            body = encode_json(station_data)
+            upload_bytes_to_data_lake(s3, bucket_name, s3_key, body)
 
-            # Also save a latest version
-            s3.put_object(
+            # Also save a latest version (server-side copy, the payload is not sent twice)
+            s3.copy_object(
                 Bucket=bucket_name,
                 Key="landing/stations/osm_enhanced_latest.json",
-                Body=json.dumps(station_data)
+                CopySource={"Bucket": bucket_name, "Key": s3_key}
             )
 
             print(f"Enhanced OSM station data extracted and saved to {s3_key}")
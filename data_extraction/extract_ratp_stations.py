@@ -1,23 +1,18 @@
 """
 Station data extraction script for La Défense using RATP API
 """
-import json
+import re
+from collections import defaultdict
 from datetime import datetime
-import boto3
-from botocore.client import Config
+from concurrent.futures import ThreadPoolExecutor
 from configuration import config
-from api_utils import get_with_retries, API_ENDPOINTS
-
-def get_s3_client():
-    """Create and return an S3 client connected to MinIO"""
-    return boto3.client(
-        's3',
-        endpoint_url=config.DATA_LAKE["endpoint_url"],
-        aws_access_key_id=config.DATA_LAKE["access_key"],
-        aws_secret_access_key=config.DATA_LAKE["secret_key"],
-        config=Config(signature_version='s3v4'),
-        region_name='us-east-1'
-    )
+from utils.data_lake_utils import get_s3_client, upload_bytes_to_data_lake
+from api_utils import get_with_retries, API_ENDPOINTS, decode_json, encode_json
+
+# Single-pass, case-insensitive name filters (accented "Défense" included)
+DEFENSE_RE = re.compile(r"d[eé]fense", re.IGNORECASE)
+LADEFENSE_AREA_RE = re.compile(r"d[eé]fense|grande arche|cnit|esplanade|quatre temps", re.IGNORECASE)
+
 
 def extract_ratp_station_data():
     """Extract detailed information about RATP stations at La Défense"""
@@ -55,13 +50,32 @@ def extract_ratp_station_data():
         "q": "la+defense",
         "rows": 10
     }
+
+    # Every endpoint is independent: all requests are sent at once (I/O bound, threads
+    # share the pooled session), stations are then built in the usual order
+    requests_to_send = {
+        "rer_e": (rer_e_stations_url, None),
+        "transilien_l": (transilien_l_stations_url, None),
+        "metro": (metro_stations_url, None),
+        "rer_a": (rer_stations_url, None),
+        "equipment": (equipment_url, equipment_params),
+        "accessibility": (accessibility_url, accessibility_params),
+    }
+    for bus_line in bus_lines:
+        requests_to_send[f"bus_{bus_line}"] = (f'https://api-ratp.pierre-grimaud.fr/v4/stations/buses/{bus_line}', None)
+
+    with ThreadPoolExecutor(max_workers=len(requests_to_send)) as executor:
+        futures = {
+            name: executor.submit(get_with_retries, url, params=params, max_retries=3)
+            for name, (url, params) in requests_to_send.items()
+        }
     try:
         # Get RER E stations
-        rer_e_response = get_with_retries(rer_e_stations_url, max_retries=3)
+        rer_e_response = futures["rer_e"].result()
         if rer_e_response and rer_e_response.status_code == 200:
-            rer_e_data = rer_e_response.json()
+            rer_e_data = decode_json(rer_e_response)
             for station in rer_e_data.get("result", {}).get("stations", []):
-                if "defense" in station.get("name", "").lower():
+                if DEFENSE_RE.search(station.get("name", "")):
                     station_info = {
                         "name": station.get("name", ""),
                         "id": station.get("id", ""),
@@ -75,11 +89,11 @@ def extract_ratp_station_data():
                     station_data["stations"].append(station_info)
 
         # Get Transilien L stations
-        transilien_l_response = get_with_retries(transilien_l_stations_url, max_retries=3)
+        transilien_l_response = futures["transilien_l"].result()
         if transilien_l_response and transilien_l_response.status_code == 200:
-            transilien_l_data = transilien_l_response.json()
+            transilien_l_data = decode_json(transilien_l_response)
             for station in transilien_l_data.get("result", {}).get("stations", []):
-                if "defense" in station.get("name", "").lower():
+                if DEFENSE_RE.search(station.get("name", "")):
                     station_info = {
                         "name": station.get("name", ""),
                         "id": station.get("id", ""),
@@ -94,15 +108,13 @@ def extract_ratp_station_data():
 
         # Get Bus stations
         for bus_line in bus_lines:
-            bus_url = f'https://api-ratp.pierre-grimaud.fr/v4/stations/buses/{bus_line}'
-            bus_response = get_with_retries(bus_url, max_retries=3)
+            bus_response = futures[f"bus_{bus_line}"].result()
 
             if bus_response and bus_response.status_code == 200:
-                bus_data = bus_response.json()
+                bus_data = decode_json(bus_response)
                 for station in bus_data.get("result", {}).get("stations", []):
                     # Check if station is in La Défense area
-                    if any(keyword in station.get("name", "").lower()
-                           for keyword in ["defense", "grande arche", "cnit", "esplanade", "quatre temps"]):
+                    if LADEFENSE_AREA_RE.search(station.get("name", "")):
                         station_info = {
                             "name": station.get("name", ""),
                             "id": station.get("id", ""),
@@ -116,14 +128,14 @@ def extract_ratp_station_data():
                         station_data["stations"].append(station_info)
 
         # Get Metro Line 1 stations with retry logic
-        metro_response = get_with_retries(metro_stations_url, max_retries=3)
+        metro_response = futures["metro"].result()
 
         if metro_response and metro_response.status_code == 200:
-            metro_data = metro_response.json()
+            metro_data = decode_json(metro_response)
 
             # Find La Défense station
             for station in metro_data.get("result", {}).get("stations", []):
-                if "defense" in station.get("name", "").lower():
+                if DEFENSE_RE.search(station.get("name", "")):
                     station_info = {
                         "name": station.get("name", ""),
                         "id": station.get("id", ""),
@@ -141,14 +153,14 @@ def extract_ratp_station_data():
             print(f"Error retrieving RATP Metro stations: {metro_response.status_code if metro_response else 'No response'}")
 
         # Get RER A stations with retry logic
-        rer_response = get_with_retries(rer_stations_url, max_retries=3)
+        rer_response = futures["rer_a"].result()
 
         if rer_response and rer_response.status_code == 200:
-            rer_data = rer_response.json()
+            rer_data = decode_json(rer_response)
 
             # Find La Défense station
             for station in rer_data.get("result", {}).get("stations", []):
-                if "defense" in station.get("name", "").lower():
+                if DEFENSE_RE.search(station.get("name", "")):
                     station_info = {
                         "name": station.get("name", ""),
                         "id": station.get("id", ""),
@@ -166,10 +178,10 @@ def extract_ratp_station_data():
             print(f"Error retrieving RATP RER stations: {rer_response.status_code if rer_response else 'No response'}")
 
         # Get equipment status with retry logic
-        equipment_response = get_with_retries(equipment_url, params=equipment_params, max_retries=3)
+        equipment_response = futures["equipment"].result()
 
         if equipment_response and equipment_response.status_code == 200:
-            equipment_data = equipment_response.json()
+            equipment_data = decode_json(equipment_response)
 
             # Process equipment data
             equipment_items = []
@@ -186,30 +198,51 @@ def extract_ratp_station_data():
                 }
                 equipment_items.append(item)
 
+            # Index equipment by lowercased station name once: each station then scans
+            # the distinct names instead of every equipment item
+            equipment_by_station = defaultdict(list)
+            for item in equipment_items:
+                equipment_by_station[item["station"].lower()].append(item)
+
             # Attach equipment data to stations
             for station in station_data["stations"]:
-                station_equipment = [item for item in equipment_items
-                                    if station["name"].lower() in item["station"].lower()]
-
-                # Summarize equipment
-                elevators = [item for item in station_equipment if "ascenseur" in item["type"].lower()]
-                escalators = [item for item in station_equipment if "escalier" in item["type"].lower()]
-                gates = [item for item in station_equipment if "ligne" in item["type"].lower() and "controle" in item["type"].lower()]
+                station_key = station["name"].lower()
+                station_equipment = [
+                    item
+                    for name, items in equipment_by_station.items() if station_key in name
+                    for item in items
+                ]
+
+                # Summarize equipment (one pass, type and status lowercased once per item)
+                elevators, escalators, gates = [], [], []
+                elevators_op = escalators_op = gates_op = 0
+                for item in station_equipment:
+                    item_type = item["type"].lower()
+                    op = item["status"].lower() == "en service"
+                    if "ascenseur" in item_type:
+                        elevators.append(item)
+                        elevators_op += op
+                    if "escalier" in item_type:
+                        escalators.append(item)
+                        escalators_op += op
+                    if "ligne" in item_type and "controle" in item_type:
+                        gates.append(item)
+                        gates_op += op
 
                 station["equipment"] = {
                     "elevators": {
                         "count": len(elevators),
-                        "operational": len([e for e in elevators if e["status"].lower() == "en service"]),
+                        "operational": elevators_op,
                         "details": elevators
                     },
                     "escalators": {
                         "count": len(escalators),
-                        "operational": len([e for e in escalators if e["status"].lower() == "en service"]),
+                        "operational": escalators_op,
                         "details": escalators
                     },
                     "gates": {
                         "count": len(gates),
-                        "operational": len([g for g in gates if g["status"].lower() == "en service"]),
+                        "operational": gates_op,
                         "details": gates
                     }
                 }
@@ -219,18 +252,21 @@ def extract_ratp_station_data():
             print(f"Error retrieving RATP equipment data: {equipment_response.status_code if equipment_response else 'No response'}")
 
         # Get accessibility information with retry logic
-        accessibility_response = get_with_retries(accessibility_url, params=accessibility_params, max_retries=3)
+        accessibility_response = futures["accessibility"].result()
 
         if accessibility_response and accessibility_response.status_code == 200:
-            accessibility_data = accessibility_response.json()
+            accessibility_data = decode_json(accessibility_response)
+
+            # Station names lowercased once for every accessibility record
+            stations_by_lower_name = [(station["name"].lower(), station) for station in station_data["stations"]]
 
             for record in accessibility_data.get("records", []):
                 fields = record.get("fields", {})
-                station_name = fields.get("nom_gare", "")
+                station_name = fields.get("nom_gare", "").lower()
 
                 # Find the corresponding station
-                for station in station_data["stations"]:
-                    if station_name.lower() in station["name"].lower() or station["name"].lower() in station_name.lower():
+                for station_key, station in stations_by_lower_name:
+                    if station_name in station_key or station_key in station_name:
                         station["coordinates"] = {
                             "lat": fields.get("coord_geo", [0, 0])[0] if fields.get("coord_geo") else 0,
                             "lon": fields.get("coord_geo", [0, 0])[1] if fields.get("coord_geo") else 0
@@ -252,17 +288,14 @@ def extract_ratp_station_data():
 
         # Save to data lake regardless of partial data collection
         s3_key = f"landing/stations/ratp_stations_{timestamp}.json"
-        s3.put_object(
-            Bucket=bucket_name,
-            Key=s3_key,
-            Body=json.dumps(station_data)
-        )
+        body = encode_json(station_data)
+        upload_bytes_to_data_lake(s3, bucket_name, s3_key, body)
 
-        # Also save a latest version
-        s3.put_object(
+        # Also save a latest version (server-side copy, the payload is not sent twice)
+        s3.copy_object(
             Bucket=bucket_name,
             Key="landing/stations/ratp_stations_latest.json",
-            Body=json.dumps(station_data)
+            CopySource={"Bucket": bucket_name, "Key": s3_key}
         )
 
         print(f"RATP station data extracted and saved to {s3_key}")
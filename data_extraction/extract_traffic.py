@@ -1,28 +1,17 @@
 """
 Traffic data extraction script for La Défense area
 """
-import json
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import os
-import boto3
-from botocore.client import Config
 from dotenv import load_dotenv
 from configuration import config
-from api_utils import get_with_retries, API_ENDPOINTS
+from utils.data_lake_utils import get_s3_client, upload_bytes_to_data_lake
+from api_utils import get_with_retries, API_ENDPOINTS, decode_json, encode_json
 
 # Load environment variables
 load_dotenv()
 
-def get_s3_client():
-    """Create and return an S3 client connected to MinIO"""
-    return boto3.client(
-        's3',
-        endpoint_url=config.DATA_LAKE["endpoint_url"],
-        aws_access_key_id=config.DATA_LAKE["access_key"],
-        aws_secret_access_key=config.DATA_LAKE["secret_key"],
-        config=Config(signature_version='s3v4'),
-        region_name='us-east-1'
-    )
 
 def extract_traffic_data():
     """Extract traffic data for La Défense area"""
@@ -46,25 +35,33 @@ def extract_traffic_data():
         "sources": []
     }
 
-    # 1. TomTom data (if API key is available)
+    # The three sources are independent: requests are sent together, responses
+    # are then processed in the usual order so "sources" keeps the same ordering
+    jobs = {"sytadin": API_ENDPOINTS['sytadin_traffic']}  # updated Sytadin URL from API_ENDPOINTS
     if tomtom_api_key:
-        try:
-            # Traffic flow data
-            flow_url = f"https://api.tomtom.com/traffic/services/4/flowSegmentData/absolute/10/json?point={lat},{lon}&unit=KMPH&openLr=false&key={tomtom_api_key}"
+        # Traffic flow data
+        jobs["tomtom_flow"] = f"https://api.tomtom.com/traffic/services/4/flowSegmentData/absolute/10/json?point={lat},{lon}&unit=KMPH&openLr=false&key={tomtom_api_key}"
 
-            # Incidents data
-            incidents_url = f"https://api.tomtom.com/traffic/services/5/incidentDetails?bbox={bbox['min_lon']},{bbox['min_lat']},{bbox['max_lon']},{bbox['max_lat']}&fields={{incidents{{type,geometry{{type,coordinates}},properties{{iconCategory,magnitudeOfDelay,events{{description,code}},startTime,endTime,from,to,length,delay,roadNumbers,timeValidity}}}}&language=fr-FR&timeValidityFilter=present&key={tomtom_api_key}"
+        # Incidents data
+        jobs["tomtom_incidents"] = f"https://api.tomtom.com/traffic/services/5/incidentDetails?bbox={bbox['min_lon']},{bbox['min_lat']},{bbox['max_lon']},{bbox['max_lat']}&fields={{incidents{{type,geometry{{type,coordinates}},properties{{iconCategory,magnitudeOfDelay,events{{description,code}},startTime,endTime,from,to,length,delay,roadNumbers,timeValidity}}}}&language=fr-FR&timeValidityFilter=present&key={tomtom_api_key}"
 
-            # Get flow data with retry logic
-            flow_response = get_with_retries(flow_url, max_retries=3)
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        # get_with_retries handles the retry logic for each request
+        futures = {name: executor.submit(get_with_retries, url, max_retries=3) for name, url in jobs.items()}
+
+    # 1. TomTom data (if API key is available)
+    if tomtom_api_key:
+        try:
+            # Get flow data
+            flow_response = futures["tomtom_flow"].result()
             if flow_response and flow_response.status_code == 200:
-                traffic_data["tomtom_flow"] = flow_response.json()
+                traffic_data["tomtom_flow"] = decode_json(flow_response)
                 traffic_data["sources"].append("TomTom Flow")
 
-            # Get incidents data with retry logic
-            incidents_response = get_with_retries(incidents_url, max_retries=3)
+            # Get incidents data
+            incidents_response = futures["tomtom_incidents"].result()
             if incidents_response and incidents_response.status_code == 200:
-                traffic_data["tomtom_incidents"] = incidents_response.json()
+                traffic_data["tomtom_incidents"] = decode_json(incidents_response)
                 if "TomTom Flow" not in traffic_data["sources"]:
                     traffic_data["sources"].append("TomTom")
 
@@ -76,16 +73,13 @@ def extract_traffic_data():
 
     # 2. Sytadin data (with updated URL)
     try:
-        # Using the updated Sytadin URL from API_ENDPOINTS
-        sytadin_url = API_ENDPOINTS['sytadin_traffic']
-
-        # Get Sytadin data with retry logic
-        sytadin_response = get_with_retries(sytadin_url, max_retries=3)
+        # Get Sytadin data
+        sytadin_response = futures["sytadin"].result()
 
         if sytadin_response and sytadin_response.status_code == 200:
             try:
                 # Try to parse as JSON
-                data = sytadin_response.json()
+                data = decode_json(sytadin_response)
                 traffic_data["sytadin"] = data
                 traffic_data["sources"].append("Sytadin")
                 print("Sytadin traffic data retrieved successfully")
@@ -100,17 +94,14 @@ def extract_traffic_data():
 
     # Save to data lake
     s3_key = f"landing/traffic/traffic_ladefense_{timestamp}.json"
-    s3.put_object(
-        Bucket=bucket_name,
-        Key=s3_key,
-        Body=json.dumps(traffic_data)
-    )
+    body = encode_json(traffic_data)
+    upload_bytes_to_data_lake(s3, bucket_name, s3_key, body)
 
-    # Also save a latest version
-    s3.put_object(
+    # Also save a latest version (server-side copy, the payload is not sent twice)
+    s3.copy_object(
         Bucket=bucket_name,
         Key="landing/traffic/traffic_ladefense_latest.json",
-        Body=json.dumps(traffic_data)
+        CopySource={"Bucket": bucket_name, "Key": s3_key}
     )
 
     print(f"Traffic data extracted and saved to {s3_key}")
@@ -1,23 +1,15 @@
 """
 Transport data extraction script for La Défense
 """
-import json
 from datetime import datetime
-import boto3
-from botocore.client import Config
+from concurrent.futures import ThreadPoolExecutor
 from configuration import config
-from api_utils import get_with_retries, API_ENDPOINTS  # Import the new API utilities
+from utils.data_lake_utils import get_s3_client, upload_bytes_to_data_lake
+from api_utils import get_with_retries, decode_json, encode_json
+
+# Parallel line/station requests (stays below the api_utils connection pool size)
+MAX_CONCURRENT_STATIONS = 16
 
-def get_s3_client():
-    """Create and return an S3 client connected to MinIO"""
-    return boto3.client(
-        's3',
-        endpoint_url=config.DATA_LAKE["endpoint_url"],
-        aws_access_key_id=config.DATA_LAKE["access_key"],
-        aws_secret_access_key=config.DATA_LAKE["secret_key"],
-        config=Config(signature_version='s3v4'),
-        region_name='us-east-1'
-    )
 
 def extract_ratp_transport_data():
     """Extract transport data from RATP API for La Défense stations"""
@@ -52,65 +44,68 @@ def extract_ratp_transport_data():
         ]
     }
 
-    # Extract data by transport type
-    for transport_type, stations_list in stations.items():
-        for station_info in stations_list:
-            line = station_info["line"]
-            station = station_info["station"]
+    def extract_station(transport_type, station_info):
+        """Fetch schedules and traffic for one line/station and save them"""
+        line = station_info["line"]
+        station = station_info["station"]
 
-            # API endpoints using the constants from api_utils
-            schedules_url = API_ENDPOINTS['ratp_schedules'].format(
-                type=transport_type, line=line, station=station
-            )
-            traffic_url = API_ENDPOINTS['ratp_traffic'].format(
-                type=transport_type, line=line
-            )
+        # API endpoints built from the shared templates in config
+        url_params = {"type": transport_type, "line": line, "station": station}
+        schedules_url = config.RATP_SCHEDULES_URL(url_params)
+        traffic_url = config.RATP_TRAFFIC_URL(url_params)
 
-            try:
-                # Get schedule data with retry logic
-                schedules_response = get_with_retries(schedules_url, max_retries=3)
-                if schedules_response and schedules_response.status_code == 200:
-                    schedules_data = schedules_response.json()
-                else:
-                    schedules_data = {"error": f"Failed to retrieve schedules (status: {schedules_response.status_code if schedules_response else 'No response'})"}
+        try:
+            # Get schedule data with retry logic
+            schedules_response = get_with_retries(schedules_url, max_retries=3)
+            if schedules_response and schedules_response.status_code == 200:
+                schedules_data = decode_json(schedules_response)
+            else:
+                schedules_data = {"error": f"Failed to retrieve schedules (status: {schedules_response.status_code if schedules_response else 'No response'})"}
 
-                # Get traffic data with retry logic
-                traffic_response = get_with_retries(traffic_url, max_retries=3)
-                if traffic_response and traffic_response.status_code == 200:
-                    traffic_data = traffic_response.json()
-                else:
-                    traffic_data = {"error": f"Failed to retrieve traffic (status: {traffic_response.status_code if traffic_response else 'No response'})"}
+            # Get traffic data with retry logic
+            traffic_response = get_with_retries(traffic_url, max_retries=3)
+            if traffic_response and traffic_response.status_code == 200:
+                traffic_data = decode_json(traffic_response)
+            else:
+                traffic_data = {"error": f"Failed to retrieve traffic (status: {traffic_response.status_code if traffic_response else 'No response'})"}
 
-                # Combine data with metadata
-                combined_data = {
-                    "extraction_time": datetime.now().isoformat(),
-                    "transport_type": transport_type,
-                    "line": line,
-                    "station": station,
-                    "schedules": schedules_data,
-                    "traffic": traffic_data
-                }
+            # Combine data with metadata
+            combined_data = {
+                "extraction_time": datetime.now().isoformat(),
+                "transport_type": transport_type,
+                "line": line,
+                "station": station,
+                "schedules": schedules_data,
+                "traffic": traffic_data
+            }
 
-                # Save to data lake
-                s3_key = f"landing/transport/{transport_type}_{line}_{timestamp}.json"
-                s3.put_object(
-                    Bucket=bucket_name,
-                    Key=s3_key,
-                    Body=json.dumps(combined_data)
-                )
+            # Save to data lake
+            s3_key = f"landing/transport/{transport_type}_{line}_{timestamp}.json"
+            body = encode_json(combined_data)
+            upload_bytes_to_data_lake(s3, bucket_name, s3_key, body)
+
+            # Also save a latest version (server-side copy, the payload is not sent twice)
+            latest_key = f"landing/transport/{transport_type}_{line}_latest.json"
+            s3.copy_object(
+                Bucket=bucket_name,
+                Key=latest_key,
+                CopySource={"Bucket": bucket_name, "Key": s3_key}
+            )
 
-                # Also save a latest version
-                latest_key = f"landing/transport/{transport_type}_{line}_latest.json"
-                s3.put_object(
-                    Bucket=bucket_name,
-                    Key=latest_key,
-                    Body=json.dumps(combined_data)
-                )
+            print(f"Transport data extracted and saved for {transport_type} {line} at La Défense")
 
-                print(f"Transport data extracted and saved for {transport_type} {line} at La Défense")
+        except Exception as e:
+            print(f"Error extracting data for {transport_type} {line}: {str(e)}")
 
-            except Exception as e:
-                print(f"Error extracting data for {transport_type} {line}: {str(e)}")
+    # Extract data by transport type: the stations are independent, fetched concurrently
+    # (I/O bound, the pooled session from api_utils is shared by the threads)
+    jobs = [
+        (transport_type, station_info)
+        for transport_type, stations_list in stations.items()
+        for station_info in stations_list
+    ]
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_STATIONS) as executor:
+        list(executor.map(lambda job: extract_station(*job), jobs))
 
 if __name__ == "__main__":
     extract_ratp_transport_data()
\ No newline at end of file
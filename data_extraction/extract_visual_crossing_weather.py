@@ -5,27 +5,15 @@ import requests
 import json
 from datetime import datetime, timedelta
 import os
-import boto3
-from botocore.client import Config
 from dotenv import load_dotenv
 from configuration import config
+from utils.data_lake_utils import get_s3_client
+from api_utils import decode_json
 
 # Load environment variables
 load_dotenv()
 
 
-def get_s3_client():
-    """Create and return an S3 client connected to MinIO"""
-    return boto3.client(
-        's3',
-        endpoint_url=config.DATA_LAKE["endpoint_url"],
-        aws_access_key_id=config.DATA_LAKE["access_key"],
-        aws_secret_access_key=config.DATA_LAKE["secret_key"],
-        config=Config(signature_version='s3v4'),
-        region_name='us-east-1'
-    )
-
-
 def extract_visual_crossing_data():
     """Extract weather data from Visual Crossing API and store in data lake"""
     # Get API key from environment variables
@@ -74,7 +62,7 @@ def extract_visual_crossing_data():
         response = requests.get(url, params=params)
 
         if response.status_code == 200:
-            data = response.json()
+            data = decode_json(response)
 
             # Enhance the data with extraction metadata
             weather_data = {
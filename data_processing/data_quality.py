@@ -2,9 +2,10 @@
 Basic data quality monitoring for La Défense mobility data lake
 Performs essential checks on data completeness and structure
 """
-import json
 import logging
+import re
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import os
 import sys
 
@@ -15,7 +16,7 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 from configuration.config import DATA_LAKE
-from utils.data_lake_utils import check_file_exists, read_json_from_data_lake
+from utils.data_lake_utils import get_s3_client, list_all_keys, loads_json
 
 # Set up logging
 logging.basicConfig(
@@ -27,7 +28,12 @@ logger = logging.getLogger('data_quality')
 
 def check_json_structure(bucket, key, required_fields):
     """Check if a JSON file has the required fields"""
-    data = read_json_from_data_lake(bucket, key)
+    try:
+        response = get_s3_client().get_object(Bucket=bucket, Key=key)
+        data = loads_json(response['Body'].read())
+    except Exception as e:
+        logger.error(f"❌ Error reading JSON: {key} - {str(e)}")
+        return False
 
     if not data:
         logger.error(f"❌ Error reading JSON: {key}")
@@ -46,6 +52,37 @@ def check_json_structure(bucket, key, required_fields):
         return False
 
 
+# Size of the head range read to check the top-level keys
+JSON_HEAD_BYTES = 32768
+
+
+def check_json_top_keys(bucket, key, required_fields):
+    """Check required JSON fields from the first bytes of the file (range GET)"""
+    s3 = get_s3_client()
+    try:
+        response = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes=0-{JSON_HEAD_BYTES - 1}")
+        head = response['Body'].read().decode('utf-8', errors='ignore')
+    except Exception as e:
+        logger.warning(f"Range read failed for {key}, falling back to full parse - {str(e)}")
+        return check_json_structure(bucket, key, required_fields)
+
+    pattern = re.compile(r'"(%s)"\s*:' % "|".join(map(re.escape, required_fields)))
+    found = set(pattern.findall(head))
+    if found.issuperset(required_fields):
+        logger.info(f"✅ JSON structure valid: {key}")
+        return True
+
+    # File larger than the head range: missing keys may come later
+    content_range = response.get('ContentRange', '')
+    total_size = content_range.rpartition('/')[2]
+    if total_size.isdigit() and int(total_size) > JSON_HEAD_BYTES:
+        return check_json_structure(bucket, key, required_fields)
+
+    missing_fields = [field for field in required_fields if field not in found]
+    logger.error(f"❌ JSON missing fields: {key} - {', '.join(missing_fields)}")
+    return False
+
+
 def run_basic_checks():
     """Run basic quality checks on the data lake"""
     bucket = DATA_LAKE["bucket_name"]
@@ -54,73 +91,67 @@ def run_basic_checks():
     print(f"Running data quality checks at {timestamp}...")
     logger.info(f"Starting data quality check run at {timestamp}")
 
-    # List of checks with their status
-    checks = []
-
-    # Weather data checks
-    weather_exists = check_file_exists(bucket, "landing/weather/visual_crossing_latest.json")
-    checks.append(("Weather data exists", weather_exists))
+    # One listing per prefix instead of a head_object per file
+    existing_keys = (list_all_keys(bucket, "landing/") or set()) | (list_all_keys(bucket, "refined/") or set())
 
-    if weather_exists:
-        weather_structure = check_json_structure(
-            bucket,
-            "landing/weather/visual_crossing_latest.json",
-            ["extraction_time", "source", "location", "coordinates", "current_conditions", "days"]
-        )
-        checks.append(("Weather data structure", weather_structure))
+    def file_exists(key):
+        if key in existing_keys:
+            logger.info(f"File exists: {key}")
+            return True
+        logger.warning(f"File does not exist: {key}")
+        return False
 
-    # Transport data checks - RATP Source
+    # Checks in display order: (name, key, required JSON fields or None)
+    transport_fields = ["extraction_time", "transport_type", "line", "station", "schedules", "traffic"]
     transport_types = {
         "metro": "1",
         "rers": "A",
         "tramways": "2"
     }
 
+    planned_checks = [
+        ("Weather data exists", "landing/weather/visual_crossing_latest.json",
+         ["extraction_time", "source", "location", "coordinates", "current_conditions", "days"]),
+    ]
+    # Transport data checks - RATP Source
     for transport_type, line in transport_types.items():
-        key = f"landing/transport/{transport_type}_{line}_latest.json"
-        transport_exists = check_file_exists(bucket, key)
-        checks.append((f"{transport_type.capitalize()} {line} data exists", transport_exists))
-
-        if transport_exists:
-            transport_structure = check_json_structure(
-                bucket,
-                key,
-                ["extraction_time", "transport_type", "line", "station", "schedules", "traffic"]
-            )
-            checks.append((f"{transport_type.capitalize()} {line} data structure", transport_structure))
-
-    # IDFM data checks
-    idfm_exists = check_file_exists(bucket, "landing/transport/idfm_ladefense_latest.json")
-    checks.append(("IDFM data exists", idfm_exists))
-
-    if idfm_exists:
-        idfm_structure = check_json_structure(
-            bucket,
-            "landing/transport/idfm_ladefense_latest.json",
-            ["extraction_time", "location", "coordinates", "stops", "departures", "traffic_status"]
-        )
-        checks.append(("IDFM data structure", idfm_structure))
-
-    # Processed IDFM data
-    processed_transport_exists = check_file_exists(bucket, "refined/transport/schedules_latest.parquet")
-    checks.append(("Processed transport schedules exist", processed_transport_exists))
-
-    processed_traffic_exists = check_file_exists(bucket, "refined/transport/traffic_latest.parquet")
-    checks.append(("Processed traffic status exists", processed_traffic_exists))
-
-    # Station data checks
-    ratp_stations_exists = check_file_exists(bucket, "landing/stations/ratp_stations_latest.json")
-    checks.append(("RATP stations data exists", ratp_stations_exists))
-
-    osm_stations_exists = check_file_exists(bucket, "landing/stations/osm_enhanced_latest.json")
-    checks.append(("OSM stations data exists", osm_stations_exists))
-
-    combined_stations_exists = check_file_exists(bucket, "refined/stations/combined_stations_latest.parquet")
-    checks.append(("Combined stations data exists", combined_stations_exists))
-
-    # Traffic data check
-    traffic_exists = check_file_exists(bucket, "landing/traffic/traffic_ladefense_latest.json")
-    checks.append(("Traffic data exists", traffic_exists))
+        planned_checks.append((
+            f"{transport_type.capitalize()} {line} data exists",
+            f"landing/transport/{transport_type}_{line}_latest.json",
+            transport_fields
+        ))
+    planned_checks += [
+        # IDFM data checks
+        ("IDFM data exists", "landing/transport/idfm_ladefense_latest.json",
+         ["extraction_time", "location", "coordinates", "stops", "departures", "traffic_status"]),
+        # Processed IDFM data
+        ("Processed transport schedules exist", "refined/transport/schedules_latest.parquet", None),
+        ("Processed traffic status exists", "refined/transport/traffic_latest.parquet", None),
+        # Station data checks
+        ("RATP stations data exists", "landing/stations/ratp_stations_latest.json", None),
+        ("OSM stations data exists", "landing/stations/osm_enhanced_latest.json", None),
+        ("Combined stations data exists", "refined/stations/combined_stations_latest.parquet", None),
+        # Traffic data check
+        ("Traffic data exists", "landing/traffic/traffic_ladefense_latest.json", None),
+    ]
+
+    exists = {key: file_exists(key) for _, key, _ in planned_checks}
+
+    # JSON structure checks of existing files run in parallel
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        structure_futures = {
+            key: executor.submit(check_json_top_keys, bucket, key, fields)
+            for _, key, fields in planned_checks
+            if fields and exists[key]
+        }
+        structure_results = {key: future.result() for key, future in structure_futures.items()}
+
+    # List of checks with their status
+    checks = []
+    for name, key, fields in planned_checks:
+        checks.append((name, exists[key]))
+        if key in structure_results:
+            checks.append((name.replace(" exists", " structure"), structure_results[key]))
 
     # Print summary
     total_checks = len(checks)
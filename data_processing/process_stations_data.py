@@ -3,27 +3,14 @@
 Combined station data processor for La Défense
 Merges station data from multiple sources into a unified dataset
 """
-import boto3
 import json
 import pandas as pd
 from io import BytesIO
 from datetime import datetime
 import os
 import configuration
-from botocore.client import Config
 from configuration.config import DATA_LAKE
-
-
-def get_s3_client():
-    """Create and return an S3 client connected to MinIO"""
-    return boto3.client(
-        's3',
-        endpoint_url=DATA_LAKE["endpoint_url"],
-        aws_access_key_id=DATA_LAKE["access_key"],
-        aws_secret_access_key=DATA_LAKE["secret_key"],
-        config=Config(signature_version='s3v4'),
-        region_name='us-east-1'
-    )
+from utils.data_lake_utils import get_s3_client, loads_json
 
 
 def process_combined_station_data():
@@ -54,8 +41,8 @@ def process_combined_station_data():
             try:
                 # Get the source data
                 response = s3.get_object(Bucket=bucket_name, Key=source_key)
-                content = response['Body'].read().decode('utf-8')
-                source_data = json.loads(content)
+                content = response['Body'].read()
+                source_data = loads_json(content)
 
                 # Record the source
                 source_info = {
@@ -6,7 +6,7 @@ import pandas as pd
 import config
 from utils_extract import (
     get_s3_client, 
-    download_file, 
+    download_to_buffer, 
     upload_with_cleanup
 )
 
@@ -101,16 +101,15 @@ def extract_frequentation_data():
         
         hourly_dataset = config.DATASETS[f'frequentationhoraire{year}']
         hourly_url = hourly_dataset['url']
-        local_hourly_path = hourly_dataset['raw_path']
         
         try:
             #fréquentation/jour
-            freq_dl_path = download_file(freq_url, local_freq_path)
-            freq_df = pd.read_csv(freq_dl_path, sep=';', encoding='utf-8')
+            freq_buffer = download_to_buffer(freq_url)
+            freq_df = pd.read_csv(freq_buffer, sep=';', encoding='utf-8')
             freq_df_cleaned = preprocess_frequentation_data(freq_df)
             #fréquentation/heure
-            hourly_dl_path = download_file(hourly_url, local_hourly_path)
-            hourly_df = pd.read_csv(hourly_dl_path, sep=';', encoding='utf-8')
+            hourly_buffer = download_to_buffer(hourly_url)
+            hourly_df = pd.read_csv(hourly_buffer, sep=';', encoding='utf-8')
             hourly_df_cleaned = preprocess_hourly_data(hourly_df)
 
             # Save
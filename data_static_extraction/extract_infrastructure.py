@@ -2,10 +2,11 @@
 Script d'extraction de prétraitement des données d'accessibilité & assenceurs de ile de france mobilité
 """
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 import config
 from utils_extract import (
     get_s3_client, 
-    download_file, 
+    download_to_buffer, 
     upload_with_cleanup,
     filter_stations
 )
@@ -34,8 +35,12 @@ def extract_infra_data():
     # Download files
     try:
     
-        accessibility_dl = download_file(accessibility_url, local_accessibility_file)
-        elevator_dl = download_file(elevator_url, local_elevator_file)
+        # Téléchargement en mémoire des deux fichiers en parallèle
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            accessibility_future = executor.submit(download_to_buffer, accessibility_url)
+            elevator_future = executor.submit(download_to_buffer, elevator_url)
+            accessibility_dl = accessibility_future.result()
+            elevator_dl = elevator_future.result()
     except Exception as e:
         print(f"Error dowloading data: {e}")
 
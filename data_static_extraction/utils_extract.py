@@ -2,9 +2,9 @@ import boto3
 from botocore.client import Config
 import config
 import pandas as pd
-import os
 import re
 import requests
+from io import BytesIO
 
 def get_s3_client():
     """Create and return an S3 client connected to MinIO"""
@@ -52,29 +52,20 @@ def upload_to_s3(s3_client, data, bucket_name, s3_key, is_refined=False):
         return None
 
 
-def download_file(url, local_filename):
+def download_to_buffer(url):
     """
-    Download a file from a given URL
-    
+    Download a file from a given URL into memory
+
     :param url: URL to download from
-    :param local_filename: Local path to save the file
-    :return: Local path of the downloaded file
+    :return: BytesIO buffer with the file content
     """
     print(f"Téléchargement des données depuis {url}...")
     try:
-        #directory exists ?
-        os.makedirs(os.path.dirname(local_filename), exist_ok=True)
-        
-        #dl file
-        response = requests.get(url, stream=True)
+        response = requests.get(url)
         response.raise_for_status()
-        
-        with open(local_filename, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        print(f"Téléchargement terminé: {local_filename}")
-        return local_filename
+
+        print(f"Téléchargement terminé: {len(response.content)} octets")
+        return BytesIO(response.content)
     except Exception as e:
         print(f"Error downloading file: {e}")
         return None
@@ -60,44 +60,55 @@ class MobilityPredictor:
         """Prepare features for ML models"""
         print("Preparing features for training...")
 
-        # Create feature dataframe
-        features_df = df.copy()
+        # Collect every derived column in a dict, the DataFrame is built once at the end
+        new_columns = {}
 
         # Encode categorical variables
         if 'transport_type' not in self.encoders:
             self.encoders['transport_type'] = LabelEncoder()
-            features_df['transport_type_encoded'] = self.encoders['transport_type'].fit_transform(
-                features_df['transport_type'])
+            new_columns['transport_type_encoded'] = self.encoders['transport_type'].fit_transform(
+                df['transport_type'])
         else:
-            features_df['transport_type_encoded'] = self.encoders['transport_type'].transform(
-                features_df['transport_type'])
+            new_columns['transport_type_encoded'] = self.encoders['transport_type'].transform(
+                df['transport_type'])
 
         if 'line' not in self.encoders:
             self.encoders['line'] = LabelEncoder()
-            features_df['line_encoded'] = self.encoders['line'].fit_transform(features_df['line'])
+            new_columns['line_encoded'] = self.encoders['line'].fit_transform(df['line'])
         else:
-            features_df['line_encoded'] = self.encoders['line'].transform(features_df['line'])
+            new_columns['line_encoded'] = self.encoders['line'].transform(df['line'])
 
         # Create time-based features
-        features_df['date'] = pd.to_datetime(features_df['date'])
-        features_df['month'] = features_df['date'].dt.month
-        features_df['day'] = features_df['date'].dt.day
-        features_df['is_rush_hour'] = ((features_df['hour'] >= 7) & (features_df['hour'] <= 9)) | \
-                                      ((features_df['hour'] >= 17) & (features_df['hour'] <= 19))
-        features_df['is_business_hours'] = (features_df['hour'] >= 9) & (features_df['hour'] <= 17)
+        dates = pd.to_datetime(df['date'])
+        hour = df['hour']
+        new_columns['month'] = dates.dt.month
+        new_columns['day'] = dates.dt.day
+        new_columns['is_rush_hour'] = ((hour >= 7) & (hour <= 9)) | ((hour >= 17) & (hour <= 19))
+        new_columns['is_business_hours'] = (hour >= 9) & (hour <= 17)
 
         # Weather impact features
-        features_df['high_precipitation'] = features_df['precipitation'] > 5
-        features_df['low_visibility'] = features_df['visibility'] < 5
-        features_df['high_wind'] = features_df['wind_speed'] > 30
-        features_df['extreme_temp'] = (features_df['temperature'] < 5) | (features_df['temperature'] > 30)
+        high_precipitation = df['precipitation'] > 5
+        low_visibility = df['visibility'] < 5
+        high_wind = df['wind_speed'] > 30
+        extreme_temp = (df['temperature'] < 5) | (df['temperature'] > 30)
+        new_columns['high_precipitation'] = high_precipitation
+        new_columns['low_visibility'] = low_visibility
+        new_columns['high_wind'] = high_wind
+        new_columns['extreme_temp'] = extreme_temp
 
         # Interaction features
-        features_df['weather_impact_score'] = (
-                features_df['high_precipitation'].astype(int) * 2 +
-                features_df['low_visibility'].astype(int) * 1.5 +
-                features_df['high_wind'].astype(int) * 1 +
-                features_df['extreme_temp'].astype(int) * 0.5
+        new_columns['weather_impact_score'] = (
+                high_precipitation.astype(int) * 2 +
+                low_visibility.astype(int) * 1.5 +
+                high_wind.astype(int) * 1 +
+                extreme_temp.astype(int) * 0.5
+        )
+
+        # Create feature dataframe in one go
+        features_df = df.drop(columns=list(new_columns), errors='ignore').assign(date=dates)
+        features_df = pd.concat(
+            [features_df, pd.DataFrame(new_columns, index=df.index)],
+            axis=1
         )
 
         # Feature columns for ML
@@ -345,15 +356,17 @@ class MobilityPredictor:
             dict with predictions
         """
         try:
-            # Prepare input features
+            # Prepare input features (date attributes read once)
+            hour = datetime_input.hour
+            day_of_week = datetime_input.weekday()
             input_data = {
-                'hour': datetime_input.hour,
-                'day_of_week': datetime_input.weekday(),
-                'is_weekend': datetime_input.weekday() >= 5,
+                'hour': hour,
+                'day_of_week': day_of_week,
+                'is_weekend': day_of_week >= 5,
                 'month': datetime_input.month,
                 'day': datetime_input.day,
-                'is_rush_hour': (7 <= datetime_input.hour <= 9) or (17 <= datetime_input.hour <= 19),
-                'is_business_hours': 9 <= datetime_input.hour <= 17,
+                'is_rush_hour': (7 <= hour <= 9) or (17 <= hour <= 19),
+                'is_business_hours': 9 <= hour <= 17,
                 'temperature': weather_conditions.get('temperature', 15),
                 'humidity': weather_conditions.get('humidity', 70),
                 'precipitation': weather_conditions.get('precipitation', 0),
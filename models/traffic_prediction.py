@@ -28,10 +28,12 @@ class TrafficPredictor:
             how='inner'
         )
 
-        # Extract time features
-        combined_data['hour'] = pd.to_datetime(combined_data['timestamp']).dt.hour
-        combined_data['day_of_week'] = pd.to_datetime(combined_data['timestamp']).dt.dayofweek
-        combined_data['is_weekend'] = (combined_data['day_of_week'] >= 5).astype(int)
+        # Extract time features (single DatetimeIndex conversion, raw ndarrays)
+        timestamps = pd.DatetimeIndex(combined_data['timestamp'])
+        day_of_week = timestamps.dayofweek.values
+        combined_data['hour'] = timestamps.hour.values
+        combined_data['day_of_week'] = day_of_week
+        combined_data['is_weekend'] = (day_of_week >= 5).view(np.int8)
 
         # Select features
         features = combined_data[[
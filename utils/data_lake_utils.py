@@ -3,10 +3,16 @@ Utility functions for data lake operations
 """
 import boto3
 from botocore.client import Config
+from botocore.exceptions import ClientError
+from boto3.s3.transfer import TransferConfig
+import hashlib
+from urllib.parse import urlparse
 import json
 import pandas as pd
 from io import BytesIO
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
 from datetime import datetime
 
 # Import configuration
@@ -21,6 +27,26 @@ if parent_dir not in sys.path:
 
 from configuration.config import DATA_LAKE
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from pyarrow import fs as pafs
+    ARROW_S3_AVAILABLE = PYARROW_AVAILABLE and hasattr(pafs, "S3FileSystem")
+except ImportError:
+    ARROW_S3_AVAILABLE = False
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -29,16 +55,119 @@ logging.basicConfig(
 logger = logging.getLogger('data_lake_utils')
 
 
+def _dumps_json(data):
+    """Serialize data to JSON bytes, with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data).encode('utf-8')
+
+
+def loads_json(raw):
+    """Parse JSON bytes, with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+# Multipart uploads: 6 MiB parts sent by up to 16 threads
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=6 * 1024 * 1024,
+    multipart_chunksize=6 * 1024 * 1024,
+    max_concurrency=16,
+    use_threads=True
+)
+
+# Shared S3 client: built once per process, its connection pool is reused by every call
+_S3 = None
+_S3_LOCK = threading.Lock()
+
+
 def get_s3_client():
-    """Create and return an S3 client connected to MinIO"""
-    return boto3.client(
-        's3',
-        endpoint_url=DATA_LAKE["endpoint_url"],
-        aws_access_key_id=DATA_LAKE["access_key"],
-        aws_secret_access_key=DATA_LAKE["secret_key"],
-        config=Config(signature_version='s3v4'),
-        region_name='us-east-1'
-    )
+    """Return the S3 client connected to MinIO (created on first call)"""
+    global _S3
+    if _S3 is None:
+        with _S3_LOCK:
+            if _S3 is None:
+                _S3 = boto3.client(
+                    's3',
+                    endpoint_url=DATA_LAKE["endpoint_url"],
+                    aws_access_key_id=DATA_LAKE["access_key"],
+                    aws_secret_access_key=DATA_LAKE["secret_key"],
+                    config=Config(
+                        signature_version='s3v4',
+                        max_pool_connections=32,
+                        retries={'max_attempts': 3, 'mode': 'standard'}
+                    ),
+                    region_name='us-east-1'
+                )
+    return _S3
+
+
+# Arrow S3 filesystem for parquet I/O: native C++ reads/writes, no Python in the data path
+_ARROW_FS = None
+
+
+def get_arrow_s3_filesystem():
+    """Return a pyarrow S3FileSystem connected to MinIO (None if pyarrow has no S3 support)"""
+    global _ARROW_FS
+    if _ARROW_FS is None and ARROW_S3_AVAILABLE:
+        with _S3_LOCK:
+            if _ARROW_FS is None:
+                endpoint = urlparse(DATA_LAKE["endpoint_url"])
+                try:
+                    _ARROW_FS = pafs.S3FileSystem(
+                        access_key=DATA_LAKE["access_key"],
+                        secret_key=DATA_LAKE["secret_key"],
+                        endpoint_override=endpoint.netloc or endpoint.path,
+                        scheme=endpoint.scheme or "http",
+                        region='us-east-1'
+                    )
+                except Exception as e:
+                    logger.warning(f"Arrow S3 filesystem unavailable, using boto3: {str(e)}")
+                    return None
+    return _ARROW_FS
+
+
+# Local on-disk object cache, revalidated by ETag
+LOCAL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ladefense")
+
+
+def cached_get(bucket, key):
+    """Return the bytes of an object, reusing the local copy while its ETag is unchanged"""
+    s3 = get_s3_client()
+    name = hashlib.sha1(f"{bucket}/{key}".encode('utf-8')).hexdigest()
+    data_path = os.path.join(LOCAL_CACHE_DIR, name + os.path.splitext(key)[1])
+    etag_path = data_path + '.etag'
+
+    etag = None
+    if os.path.exists(data_path) and os.path.exists(etag_path):
+        with open(etag_path) as f:
+            etag = f.read().strip()
+
+    try:
+        if etag:
+            response = s3.get_object(Bucket=bucket, Key=key, IfNoneMatch=etag)
+        else:
+            response = s3.get_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('304', 'NotModified'):
+            logger.debug(f"Local copy still valid: {key}")
+            with open(data_path, 'rb') as f:
+                return f.read()
+        raise
+
+    content = response['Body'].read()
+    try:
+        os.makedirs(LOCAL_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{data_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, data_path)
+        with open(etag_path, 'w') as f:
+            f.write(response['ETag'])
+    except OSError as e:
+        logger.warning(f"Could not write local cache for {key}: {str(e)}")
+    return content
 
 
 def check_file_exists(bucket, key):
@@ -53,6 +182,18 @@ def check_file_exists(bucket, key):
         return False
 
 
+def upload_bytes_to_data_lake(s3, bucket, key, body, content_type="application/json"):
+    """Upload a payload through the managed transfer (multipart, parallel parts above the threshold)
+
+    Errors are raised to the caller, as with put_object.
+    """
+    s3.upload_fileobj(
+        BytesIO(body), bucket, key,
+        ExtraArgs={"ContentType": content_type},
+        Config=S3_TRANSFER_CONFIG
+    )
+
+
 def save_json_to_data_lake(bucket, key, data):
     """Save JSON data to the data lake"""
     s3 = get_s3_client()
@@ -60,7 +201,7 @@ def save_json_to_data_lake(bucket, key, data):
         s3.put_object(
             Bucket=bucket,
             Key=key,
-            Body=json.dumps(data),
+            Body=_dumps_json(data),
             ContentType="application/json"
         )
         logger.info(f"JSON data saved to {key}")
@@ -70,17 +211,32 @@ def save_json_to_data_lake(bucket, key, data):
         return False
 
 
-def save_parquet_to_data_lake(bucket, key, dataframe):
-    """Save Pandas DataFrame as Parquet to the data lake"""
+def save_parquet_to_data_lake(bucket, key, dataframe, **parquet_kwargs):
+    """Save Pandas DataFrame as Parquet to the data lake
+
+    Extra keyword arguments (compression, row_group_size, ...) are passed to DataFrame.to_parquet.
+    """
+    arrow_fs = get_arrow_s3_filesystem()
+    if arrow_fs is not None:
+        try:
+            # engine is a to_parquet option, write_table is always pyarrow
+            options = {name: value for name, value in parquet_kwargs.items() if name != 'engine'}
+            pq.write_table(pa.Table.from_pandas(dataframe), f"{bucket}/{key}", filesystem=arrow_fs, **options)
+            logger.info(f"Parquet data saved to {key}")
+            return True
+        except Exception as e:
+            logger.error(f"Error saving Parquet to {key}: {str(e)}")
+            return False
+
     s3 = get_s3_client()
     try:
         parquet_buffer = BytesIO()
-        dataframe.to_parquet(parquet_buffer)
-        s3.put_object(
-            Bucket=bucket,
-            Key=key,
-            Body=parquet_buffer.getvalue(),
-            ContentType="application/octet-stream"
+        dataframe.to_parquet(parquet_buffer, **parquet_kwargs)
+        parquet_buffer.seek(0)
+        s3.upload_fileobj(
+            parquet_buffer, bucket, key,
+            ExtraArgs={"ContentType": "application/octet-stream"},
+            Config=S3_TRANSFER_CONFIG
         )
         logger.info(f"Parquet data saved to {key}")
         return True
@@ -89,14 +245,35 @@ def save_parquet_to_data_lake(bucket, key, dataframe):
         return False
 
 
+def save_arrow_table_to_data_lake(bucket, key, table, **write_options):
+    """Save a pyarrow Table as Parquet to the data lake (options are passed to pq.write_table)"""
+    try:
+        arrow_fs = get_arrow_s3_filesystem()
+        if arrow_fs is not None:
+            pq.write_table(table, f"{bucket}/{key}", filesystem=arrow_fs, **write_options)
+        else:
+            sink = pa.BufferOutputStream()
+            pq.write_table(table, sink, **write_options)
+            get_s3_client().upload_fileobj(
+                pa.BufferReader(sink.getvalue()), bucket, key,
+                ExtraArgs={"ContentType": "application/octet-stream"},
+                Config=S3_TRANSFER_CONFIG
+            )
+        logger.info(f"Parquet table saved to {key}")
+        return True
+    except Exception as e:
+        logger.error(f"Error saving Parquet table to {key}: {str(e)}")
+        return False
+
+
 def read_json_from_data_lake(bucket, key):
     """Read JSON data from the data lake with proper error handling"""
     s3 = get_s3_client()
     try:
         response = s3.get_object(Bucket=bucket, Key=key)
-        content = response['Body'].read().decode('utf-8')
+        content = response['Body'].read()
         logger.info(f"JSON data read from {key}")
-        return json.loads(content)
+        return loads_json(content)
     except s3.exceptions.NoSuchKey:
         # File doesn't exist - this is NORMAL for cache misses
         logger.debug(f"Cache file not found (normal): {key}")
@@ -106,13 +283,59 @@ def read_json_from_data_lake(bucket, key):
         return None
 
 
-def read_parquet_from_data_lake(bucket, key):
-    """Read Parquet data from the data lake as Pandas DataFrame"""
-    s3 = get_s3_client()
+def _read_object_bytes(bucket, key, use_cache=False):
+    """Raw bytes of an object, through the local ETag cache if asked"""
+    if use_cache:
+        return cached_get(bucket, key)
+    return get_s3_client().get_object(Bucket=bucket, Key=key)['Body'].read()
+
+
+def _read_parquet_table(source, columns=None):
+    """Decode a parquet source into an Arrow table, reading only the requested columns present in the file"""
+    parquet_file = pq.ParquetFile(source)
+    if columns is not None:
+        # Projection from the footer, columns absent from this file are skipped
+        available = set(parquet_file.schema_arrow.names)
+        columns = [col for col in columns if col in available]
+    return parquet_file.read(columns=columns)
+
+
+def _load_parquet_table(bucket, key, columns=None, use_cache=False):
+    """Read an object as an Arrow table, through the Arrow S3 filesystem unless the local cache is used"""
+    arrow_fs = None if use_cache else get_arrow_s3_filesystem()
+    if arrow_fs is not None:
+        with arrow_fs.open_input_file(f"{bucket}/{key}") as source:
+            return _read_parquet_table(source, columns)
+    # Zero-copy view over the downloaded bytes, no intermediate BytesIO copy
+    return _read_parquet_table(pa.BufferReader(_read_object_bytes(bucket, key, use_cache)), columns)
+
+
+def read_parquet_table_from_data_lake(bucket, key, columns=None, use_cache=False):
+    """Read Parquet data from the data lake as a pyarrow Table (None on error)"""
+    if not PYARROW_AVAILABLE:
+        logger.error(f"pyarrow is required to read {key} as an Arrow table")
+        return None
     try:
-        response = s3.get_object(Bucket=bucket, Key=key)
-        parquet_data = BytesIO(response['Body'].read())
-        df = pd.read_parquet(parquet_data)
+        table = _load_parquet_table(bucket, key, columns, use_cache)
+        logger.info(f"Parquet table read from {key}")
+        return table
+    except Exception as e:
+        logger.error(f"Error reading Parquet from {key}: {str(e)}")
+        return None
+
+
+def read_parquet_from_data_lake(bucket, key, columns=None, use_cache=False):
+    """Read Parquet data from the data lake as Pandas DataFrame, optionally only some columns
+
+    With use_cache=True the bytes go through the local ETag cache (see cached_get).
+    """
+    try:
+        if PYARROW_AVAILABLE:
+            table = _load_parquet_table(bucket, key, columns, use_cache)
+            df = table.to_pandas(self_destruct=True, split_blocks=True)
+        else:
+            parquet_data = BytesIO(_read_object_bytes(bucket, key, use_cache))
+            df = pd.read_parquet(parquet_data, columns=columns)
         logger.info(f"Parquet data read from {key}")
         return df
     except Exception as e:
@@ -120,6 +343,28 @@ def read_parquet_from_data_lake(bucket, key):
         return pd.DataFrame()
 
 
+def read_many_parquet_from_data_lake(bucket, keys, max_workers=16, columns=None, use_cache=False,
+                                     reader=read_parquet_from_data_lake):
+    """Read several Parquet objects in parallel, returns a dict key -> DataFrame
+
+    Pass reader=read_parquet_table_from_data_lake to get Arrow tables instead.
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(keys))) as executor:
+        futures = {
+            executor.submit(reader, bucket, key, columns, use_cache): key
+            for key in keys
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    return results
+
+
 def list_files_in_data_lake(bucket, prefix=""):
     """List files in the data lake with optional prefix"""
     s3 = get_s3_client()
@@ -133,6 +378,126 @@ def list_files_in_data_lake(bucket, prefix=""):
         return []
 
 
+def list_all_keys(bucket, prefix=""):
+    """Return the set of every object key under a prefix (paginated list_objects_v2), None on error"""
+    s3 = get_s3_client()
+    try:
+        paginator = s3.get_paginator('list_objects_v2')
+        keys = {
+            item['Key']
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix)
+            for item in page.get('Contents', [])
+        }
+        logger.info(f"Listed {len(keys)} keys with prefix {prefix}")
+        return keys
+    except Exception as e:
+        logger.error(f"Error listing keys with prefix {prefix}: {str(e)}")
+        return None
+
+
+def _partition_path(values):
+    """Hive-style sub path (col=value/...) for one combination of partition values"""
+    return "/".join(f"{column}={value}" for column, value in values.items())
+
+
+def save_partitioned_table_to_data_lake(bucket, prefix, table, partition_cols, **write_options):
+    """Save a pyarrow Table as a Hive-partitioned Parquet dataset under prefix
+
+    Partitions present in the table are replaced, the others are left untouched,
+    so adding a day only rewrites that day's files.
+    """
+    prefix = prefix.rstrip("/")
+    try:
+        arrow_fs = get_arrow_s3_filesystem()
+        if arrow_fs is not None:
+            pq.write_to_dataset(
+                table, root_path=f"{bucket}/{prefix}", partition_cols=list(partition_cols),
+                filesystem=arrow_fs, existing_data_behavior="delete_matching",
+                basename_template="part-{i}.parquet", **write_options
+            )
+        else:
+            # boto3 fallback: one object per combination of partition values
+            data_columns = [name for name in table.column_names if name not in partition_cols]
+            combinations = table.select(list(partition_cols)).group_by(list(partition_cols)).aggregate([])
+            for values in combinations.to_pylist():
+                mask = None
+                for column, value in values.items():
+                    condition = pc.equal(table[column], value)
+                    mask = condition if mask is None else pc.and_(mask, condition)
+                part = table.filter(mask).select(data_columns)
+                if not save_arrow_table_to_data_lake(
+                        bucket, f"{prefix}/{_partition_path(values)}/part-0.parquet", part, **write_options):
+                    return False
+        logger.info(f"Partitioned dataset saved to {prefix} ({', '.join(partition_cols)})")
+        return True
+    except Exception as e:
+        logger.error(f"Error saving partitioned dataset to {prefix}: {str(e)}")
+        return False
+
+
+_FILTER_OPS = {
+    "=": lambda a, b: a == b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "in": lambda a, b: a in b,
+    "not in": lambda a, b: a not in b,
+}
+
+
+def read_partitioned_table_from_data_lake(bucket, prefix, filters=None, columns=None):
+    """Read a Hive-partitioned Parquet dataset as an Arrow table
+
+    filters uses the pyarrow syntax ([('date', '>=', '2024-01-01'), ...]) and
+    skips whole partitions before any data is downloaded. Returns None on error.
+    """
+    prefix = prefix.rstrip("/")
+    try:
+        arrow_fs = get_arrow_s3_filesystem()
+        if arrow_fs is not None:
+            dataset = pq.ParquetDataset(f"{bucket}/{prefix}", filesystem=arrow_fs,
+                                        filters=filters, partitioning="hive")
+            return dataset.read(columns=columns)
+
+        # boto3 fallback: prune partitions from the listed keys
+        listed_keys = list_all_keys(bucket, f"{prefix}/")
+        if listed_keys is None:
+            return None
+        selected = {}
+        for key in sorted(listed_keys):
+            if not key.endswith(".parquet"):
+                continue
+            values = dict(
+                part.split("=", 1) for part in key[len(prefix) + 1:].split("/")[:-1] if "=" in part
+            )
+            if all(
+                column in values and _FILTER_OPS[op](
+                    values[column], [str(v) for v in value] if op in ("in", "not in") else str(value)
+                )
+                for column, op, value in (filters or [])
+            ):
+                selected[key] = values
+
+        tables = read_many_parquet_from_data_lake(bucket, selected, columns=columns,
+                                                  reader=read_parquet_table_from_data_lake)
+        parts = []
+        for key, values in selected.items():
+            table = tables.get(key)
+            if table is None:
+                continue
+            for column, value in values.items():
+                if columns is None or column in columns:
+                    table = table.append_column(column, pa.array([value] * table.num_rows, pa.string()))
+            parts.append(table)
+        return pa.concat_tables(parts, promote=True) if parts else None
+    except Exception as e:
+        logger.error(f"Error reading partitioned dataset {prefix}: {str(e)}")
+        return None
+
+
 def delete_older_files(bucket, prefix, max_files_to_keep):
     """Keep only the specified number of most recent files with a given prefix"""
     files = list_files_in_data_lake(bucket, prefix)